@@ -0,0 +1,37 @@
+@echo off
+title HD Supply Velocity Validator - Service
+color 0E
+cls
+
+echo ========================================
+echo   HD SUPPLY VELOCITY VALIDATOR
+echo   VALIDATION SERVICE
+echo   Developed by: Ben F. Benjamaa
+echo ========================================
+echo.
+
+if "%~1"=="" (
+    echo Usage: run_service.bat your.email@hdsupply.com [drop folder]
+    echo.
+    pause
+    exit /b 1
+)
+
+set WATCH_DIR=%~2
+if "%WATCH_DIR%"=="" set WATCH_DIR=%~dp0dropbox
+
+echo Drop folder: %WATCH_DIR%
+echo HTTP API:    http://127.0.0.1:8765
+echo.
+echo Press Ctrl+C to stop the service.
+echo.
+
+python velocity_validator_app.py --service --email %1 --watch-dir "%WATCH_DIR%"
+
+if %ERRORLEVEL% NEQ 0 (
+    echo.
+    echo ERROR: Service stopped with an error!
+    echo Please ensure Python is installed and dependencies are met.
+    echo.
+    pause
+)
@@ -10,6 +10,7 @@ a = Analysis(
     hiddenimports=[
         'pandas',
         'openpyxl',
+        'pyarrow',
         'snowflake.connector',
         'snowflake.connector.network',
         'tkinter',
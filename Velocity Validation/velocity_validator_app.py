@@ -11,12 +11,13 @@ Features:
 - VLOOKUP functionality for velocity code matching
 - Automated DCSKU column generation (DC + USN concatenation)
 - Excel export with HD Supply™ formatting
+- Fast CSV / Parquet / Arrow output for downstream automation
 - Summary statistics sheet
 - Match/Mismatch validation with color coding
 
 Requirements:
 - Python 3.8+
-- pandas, openpyxl, snowflake-connector-python
+- pandas, openpyxl, pyarrow, snowflake-connector-python
 - HD Supply email for Snowflake authentication
 
 Usage:
@@ -31,12 +32,1727 @@ Usage:
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import pandas as pd
+import numpy as np
 import snowflake.connector
 import os
 from datetime import datetime
 import threading
+import time
+import multiprocessing
+import queue
+import gc
+import hashlib
+import shutil
+import tempfile
+import sys
+import argparse
+import json
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import re
+import io
+import uuid
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from tkinter import font as tkfont
 
+# Maximum rows a single Excel worksheet can hold (including the header row)
+EXCEL_MAX_ROWS = 1048576
+
+# Output format choices shown in the GUI, mapped to (format key, file extension)
+OUTPUT_FORMATS = {
+    "Excel report (full, formatted)": ("excel", ".xlsx"),
+    "Excel report (mismatches only)": ("excel_mismatches", ".xlsx"),
+    "CSV (fast, full data)": ("csv", ".csv"),
+    "Parquet (fast, full data)": ("parquet", ".parquet"),
+    "Arrow / Feather (fast, full data)": ("arrow", ".arrow"),
+}
+
+# File extension for each output format key
+FORMAT_EXTENSIONS = dict(OUTPUT_FORMATS.values())
+
+# Low-cardinality columns kept as pandas categoricals (a handful of velocity classes / DCs)
+CATEGORICAL_COLUMNS = ['UDC_VELOCITY_CODE', 'PROPOSED_VELOCITY', 'DC']
+
+# Multi-sheet workbook input: sheets carrying these columns are validated,
+# and each row keeps the name of its sheet in SOURCE_SHEET_COLUMN
+INPUT_KEY_COLUMNS = ['JDA_ITEM', 'JDA_LOC']
+SOURCE_SHEET_COLUMN = 'SOURCE_SHEET'
+
+# Merged-data column: True where the JDA_ITEM/JDA_LOC key exists in SKUEXTRACT
+FOUND_COLUMN = 'In_Snowflake'
+
+# Columns always written on per-sheet output tabs, even when blank for that sheet
+SHEET_TAB_KEEP_COLUMNS = INPUT_KEY_COLUMNS + ['PROPOSED_VELOCITY', 'Current_Velocity', 'DCSKU', 'Match', FOUND_COLUMN]
+
+# Label used for blank values in summary breakdowns
+SUMMARY_BLANK_LABEL = "(blank)"
+
+# Summary tables written as companion files for flat-file output: (key, file suffix)
+SUMMARY_FILES = [
+    ('overview', '_Summary'),
+    ('transitions', '_Summary_Transitions'),
+    ('by_dc', '_Summary_By_DC'),
+    ('by_loc', '_Summary_By_LOC'),
+    ('by_sheet', '_Summary_By_Sheet'),
+]
+
+# Data rows per Excel shard when output exceeds a single worksheet
+EXCEL_SHARD_ROWS = EXCEL_MAX_ROWS - 1
+
+# Most Excel shards written at once; each worker holds its shard's data in memory
+EXCEL_SHARD_WORKERS = 4
+
+# How oversized Excel reports are split into multiple workbooks
+EXCEL_SPLIT_OPTIONS = ["Row count", "DC"]
+
+# Main window size with the advanced options collapsed; the height is clamped
+# to the screen minus WINDOW_SCREEN_MARGIN (taskbar and title bar) on small screens
+WINDOW_WIDTH = 900
+WINDOW_HEIGHT = 790
+WINDOW_SCREEN_MARGIN = 80
+
+# Interval in milliseconds at which queued worker events are applied to the GUI
+UI_POLL_MS = 100
+
+# Results viewer: starting size and rows per page (the page grows or shrinks
+# with the window), status filters and wheel scroll step
+RESULTS_WINDOW_WIDTH = 1100
+RESULTS_WINDOW_HEIGHT = 720
+RESULTS_PAGE_ROWS = 25
+RESULT_FILTERS = ["All records", "Mismatches only", "Not found in Snowflake"]
+RESULTS_ALL_DCS = "All DCs"
+RESULTS_WHEEL_ROWS = 3
+
+# Worksheet rows written / formatted between cancellation checks
+FORMAT_CANCEL_CHECK_ROWS = 10000
+
+# Seconds between Snowflake query status polls
+QUERY_POLL_SECONDS = 0.5
+
+# Partitioned fetch: SKUEXTRACT is split by a hash of one of these columns
+PARTITION_KEYS = ["ITEM", "LOC"]
+MAX_FETCH_PARTITIONS = 32
+
+# Partition result downloads that run at the same time
+FETCH_DOWNLOAD_WORKERS = 8
+
+
+# Last velocity query IDs, reused while Snowflake still holds their results (24 hours)
+QUERY_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".velocity_validator", "last_query.json")
+RESULT_REUSE_HOURS = 23
+
+# Where stage checkpoints are stored, and how long they are kept
+CHECKPOINT_DIR = os.path.join(tempfile.gettempdir(), "velocity_validator_checkpoints")
+CHECKPOINT_MAX_AGE_HOURS = 24
+
+
+# Validation service (daemon mode) defaults
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+SERVICE_WORKERS = 4
+SERVICE_REFRESH_MINUTES = 60
+SERVICE_POLL_SECONDS = 2
+
+# Input file types accepted by the validation service drop folder
+INPUT_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+
+logger = logging.getLogger("velocity_validator")
+
+
+class PipelineCancelled(Exception):
+    """Raised at a cancellation checkpoint when the user cancels processing"""
+
+
+class CheckpointStore:
+    """
+    Persist expensive pipeline stage results so a failed run can resume.
+    
+    Each run ID names a directory holding one Parquet file per completed stage.
+    The load and merge stages are keyed on the input file (run_id_for), while
+    the fetch stage depends only on the user and fetch settings
+    (fetch_run_id_for). Checkpoints are removed when the run succeeds or is
+    cancelled, and expire after CHECKPOINT_MAX_AGE_HOURS.
+    
+    Args:
+        root_dir: Directory that holds all run checkpoint directories
+    """
+    def __init__(self, root_dir=CHECKPOINT_DIR):
+        self.root_dir = root_dir
+        
+    @staticmethod
+    def run_id_for(file_path, email):
+        """Derive a stable run ID from the input file (path, size, mtime) and user"""
+        stat = os.stat(file_path)
+        key = f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}|{email.lower()}"
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        
+    @staticmethod
+    def fetch_run_id_for(email, partitions, partition_by, reuse_results):
+        """Derive a stable run ID for the Snowflake fetch from the user and fetch settings"""
+        key = f"fetch|{email.lower()}|{partitions}|{partition_by}|{bool(reuse_results)}"
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        
+    def stage_path(self, run_id, stage):
+        """Return the checkpoint file path for a stage of a run"""
+        return os.path.join(self.root_dir, run_id, f"{stage}.parquet")
+        
+    def has_any(self, run_id):
+        """Return True if any stage of the run has been checkpointed"""
+        run_dir = os.path.join(self.root_dir, run_id)
+        return os.path.isdir(run_dir) and any(name.endswith(".parquet") for name in os.listdir(run_dir))
+        
+    def load(self, run_id, stage):
+        """
+        Load a stage checkpoint.
+        
+        Returns:
+            DataFrame or None: The checkpointed frame, or None if missing or unreadable
+        """
+        path = self.stage_path(run_id, stage)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except Exception:
+            return None
+            
+    def save(self, run_id, stage, df):
+        """
+        Save a stage checkpoint atomically.
+        
+        Checkpointing is best-effort: frames Parquet cannot store (e.g. mixed-type
+        columns) are skipped rather than failing the run.
+        
+        Returns:
+            bool: True if the checkpoint was written
+        """
+        path = self.stage_path(run_id, stage)
+        temp_path = f"{path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            df.to_parquet(temp_path, index=False)
+            os.replace(temp_path, path)
+            return True
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+            
+    def clear(self, run_id):
+        """Remove all checkpoints of a run"""
+        shutil.rmtree(os.path.join(self.root_dir, run_id), ignore_errors=True)
+        
+    def cleanup_expired(self, max_age_hours=CHECKPOINT_MAX_AGE_HOURS):
+        """Remove run checkpoint directories older than max_age_hours"""
+        if not os.path.isdir(self.root_dir):
+            return
+        cutoff = time.time() - max_age_hours * 3600
+        for name in os.listdir(self.root_dir):
+            run_dir = os.path.join(self.root_dir, name)
+            if os.path.isdir(run_dir) and os.path.getmtime(run_dir) < cutoff:
+                shutil.rmtree(run_dir, ignore_errors=True)
+
+
+class QueryResultCache:
+    """
+    Remember the last velocity query IDs so re-runs can reuse their results.
+    
+    Snowflake keeps query results for 24 hours; within RESULT_REUSE_HOURS a
+    re-run with the same user and partitioning downloads them by query ID.
+    
+    Args:
+        path: JSON file holding the last query IDs
+    """
+    def __init__(self, path=QUERY_CACHE_PATH):
+        self.path = path
+        
+    def load(self, email, partitions, partition_by):
+        """
+        Return the remembered query if it matches and is recent enough.
+        
+        Returns:
+            dict or None: Entry with query_ids and executed_at, or None
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                entry = json.load(handle)
+            executed_at = datetime.fromisoformat(entry['executed_at'])
+        except (OSError, ValueError, KeyError):
+            return None
+            
+        partitions = max(1, int(partitions))
+        if (entry.get('email') != email.lower()
+                or entry.get('partitions') != partitions
+                or (partitions > 1 and entry.get('partition_by') != partition_by)
+                or len(entry.get('query_ids', [])) != partitions):
+            return None
+        if (datetime.now() - executed_at).total_seconds() > RESULT_REUSE_HOURS * 3600:
+            return None
+        return entry
+        
+    def save(self, email, query_ids, partitions, partition_by, executed_at=None):
+        """Remember the query IDs of a completed velocity fetch submitted at executed_at"""
+        entry = {
+            'email': email.lower(),
+            'query_ids': list(query_ids),
+            'partitions': max(1, int(partitions)),
+            'partition_by': partition_by,
+            'executed_at': (executed_at or datetime.now()).isoformat()
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as handle:
+                json.dump(entry, handle)
+        except OSError:
+            pass
+            
+    def clear(self):
+        """Forget the remembered query"""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+# Velocity data query against SKUEXTRACT
+# Aliases ITEM -> JDA_ITEM and LOC -> JDA_LOC to match input file format
+VELOCITY_QUERY = """
+SELECT
+    ITEM as JDA_ITEM,
+    LOC as JDA_LOC,
+    UDC_VELOCITY_CODE
+FROM
+    EDP.STD_JDA.SKUEXTRACT
+"""
+
+# Last change to SKUEXTRACT; reused query results older than this are stale
+VELOCITY_TABLE_ALTERED_QUERY = """
+SELECT LAST_ALTERED
+FROM EDP.INFORMATION_SCHEMA.TABLES
+WHERE TABLE_SCHEMA = 'STD_JDA' AND TABLE_NAME = 'SKUEXTRACT'
+"""
+
+
+def connect_velocity_source(email):
+    """
+    Open a Snowflake connection using externalbrowser (SSO) authentication.
+    
+    Args:
+        email: HD Supply email address used as the Snowflake user
+        
+    Returns:
+        SnowflakeConnection: Open connection; the caller is responsible for closing it
+    """
+    # Automated connection using externalbrowser authentication (opens browser for SSO)
+    return snowflake.connector.connect(
+        user=email,  # HD Supply email from user input
+        account="HDSUPPLY-DATA",  # HD Supply Snowflake account
+        authenticator="externalbrowser",  # SSO authentication
+        client_store_temporary_credential=True,  # Reuse the SSO token between connections
+        insecure_mode=True  # Allow insecure connections
+    )
+
+
+def build_velocity_query(partition_count=1, partition_index=0, partition_by=PARTITION_KEYS[0]):
+    """
+    Build the velocity query, optionally restricted to one hash partition.
+    
+    Args:
+        partition_count: Total number of partitions (1 returns the full query)
+        partition_index: Partition to select, 0 <= partition_index < partition_count
+        partition_by: SKUEXTRACT column whose hash assigns rows to partitions
+        
+    Returns:
+        str: SQL query
+    """
+    if partition_count <= 1:
+        return VELOCITY_QUERY
+    if partition_by not in PARTITION_KEYS:
+        raise ValueError(f"Unsupported partition column: {partition_by}")
+    return (
+        VELOCITY_QUERY
+        + f"WHERE MOD(ABS(HASH({partition_by})), {int(partition_count)}) = {int(partition_index)}\n"
+    )
+
+
+def cancel_queries(con, query_ids):
+    """Cancel running Snowflake queries, ignoring ones that already finished"""
+    cur = con.cursor()
+    try:
+        for query_id in query_ids:
+            try:
+                cur.execute(f"SELECT SYSTEM$CANCEL_QUERY('{query_id}')")
+            except Exception:
+                pass
+    finally:
+        cur.close()
+
+
+def download_partition(cur, query_id, check_cancelled):
+    """
+    Download the results of a finished asynchronous query in batches.
+    
+    Batches arrive as Arrow result chunks converted straight to DataFrames
+    (requires the connector's [pandas] extra), so no per-row Python tuples are
+    built and parallel partition downloads are not serialized on the GIL.
+    
+    Args:
+        cur: Cursor that submitted the query
+        query_id: Snowflake query ID
+        check_cancelled: Cancellation checkpoint
+        
+    Returns:
+        DataFrame: Query results
+    """
+    cur.get_results_from_sfqid(query_id)
+    columns = [col[0] for col in cur.description]
+    batches = []
+    check_cancelled()
+    for batch in cur.fetch_pandas_batches():
+        batches.append(batch)
+        check_cancelled()
+        
+    if batches:
+        return pd.concat(batches, ignore_index=True)
+    return pd.DataFrame(columns=columns)
+
+
+def fetch_velocity_data(con, check_cancelled=None, partitions=1,
+                        partition_by=PARTITION_KEYS[0], timings=None, reuse_query_ids=None):
+    """
+    Run the velocity query on an open connection and return the results.
+    
+    With partitions > 1 the query is split into hash partitions of
+    partition_by that run as concurrent asynchronous queries on the same
+    session. Each partition's results are downloaded as soon as it finishes,
+    while the remaining partitions are still running. Queries are submitted
+    asynchronously and polled, so they can be cancelled while they run.
+    
+    With reuse_query_ids, nothing is executed: the persisted results of those
+    earlier queries (one per partition) are downloaded instead, which uses
+    no warehouse time.
+    
+    Args:
+        con: Open Snowflake connection
+        check_cancelled: Optional cancellation checkpoint
+        partitions: Number of concurrent partition queries
+        partition_by: SKUEXTRACT column used to partition (see PARTITION_KEYS)
+        timings: Optional list that receives one dict per partition with
+            partition, query_id, rows, query_seconds and fetch_seconds
+        reuse_query_ids: Optional query IDs whose persisted results are downloaded
+        
+    Returns:
+        DataFrame: JDA_ITEM, JDA_LOC and UDC_VELOCITY_CODE columns
+    """
+    check_cancelled = check_cancelled or (lambda: None)
+    if reuse_query_ids:
+        partitions = len(reuse_query_ids)
+    partitions = max(1, min(int(partitions), MAX_FETCH_PARTITIONS))
+    check_cancelled()
+    
+    def download(index, cur, query_id, query_seconds):
+        started = time.time()
+        frame = download_partition(cur, query_id, check_cancelled)
+        return frame, {
+            'partition': index + 1,
+            'query_id': query_id,
+            'rows': len(frame),
+            'query_seconds': round(query_seconds, 2),
+            'fetch_seconds': round(time.time() - started, 2)
+        }
+        
+    cursors = []
+    pending = {}
+    downloads = []
+    executor = ThreadPoolExecutor(max_workers=min(partitions, FETCH_DOWNLOAD_WORKERS))
+    try:
+        # Submit every partition before waiting on any of them
+        for index in range(partitions):
+            cur = con.cursor()
+            cursors.append(cur)
+            if reuse_query_ids:
+                pending[reuse_query_ids[index]] = (index, cur, time.time())
+            else:
+                cur.execute_async(build_velocity_query(partitions, index, partition_by))
+                pending[cur.sfqid] = (index, cur, time.time())
+            
+        # Poll all running partitions; download each one as soon as it finishes
+        while pending:
+            check_cancelled()
+            for query_id in list(pending):
+                if con.is_still_running(con.get_query_status_throw_if_error(query_id)):
+                    continue
+                index, cur, submitted = pending.pop(query_id)
+                downloads.append(executor.submit(download, index, cur, query_id, time.time() - submitted))
+            if pending:
+                time.sleep(QUERY_POLL_SECONDS)
+                
+        frames = []
+        for future in as_completed(downloads):
+            frame, timing = future.result()
+            frames.append(frame)
+            if timings is not None:
+                timings.append(timing)
+    except BaseException:
+        # Stop partitions still running on the warehouse
+        if pending and not reuse_query_ids:
+            cancel_queries(con, list(pending))
+        raise
+    finally:
+        executor.shutdown(wait=True)
+        for cur in cursors:
+            cur.close()
+            
+    if timings is not None:
+        timings.sort(key=lambda timing: timing['partition'])
+    # Empty partitions carry no type information; leave them out so they do not
+    # turn the typed columns of the other partitions into object columns
+    frames = [frame for frame in frames if len(frame)] or frames[:1]
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def velocity_table_last_altered(con):
+    """
+    Return when SKUEXTRACT was last changed, in local time.
+    
+    Args:
+        con: Open Snowflake connection
+        
+    Returns:
+        datetime or None: Naive local timestamp, or None if it cannot be read
+    """
+    cur = con.cursor()
+    try:
+        cur.execute(VELOCITY_TABLE_ALTERED_QUERY)
+        row = cur.fetchone()
+    except Exception:
+        return None
+    finally:
+        cur.close()
+    if not row or row[0] is None:
+        return None
+    last_altered = row[0]
+    if last_altered.tzinfo is not None:
+        last_altered = last_altered.astimezone().replace(tzinfo=None)
+    return last_altered
+
+
+def fetch_velocity_data_reusing(con, email, query_cache, check_cancelled=None, partitions=1,
+                                partition_by=PARTITION_KEYS[0], timings=None, allow_reuse=True):
+    """
+    Fetch velocity data, reusing the last query's persisted results when possible.
+    
+    If the same user ran the same (partitioned) query within
+    RESULT_REUSE_HOURS and SKUEXTRACT has not changed since, its results are
+    re-downloaded by query ID instead of scanning SKUEXTRACT again. Otherwise,
+    or if the table's change time cannot be read or the persisted results are
+    no longer available, a new query runs and its query IDs are remembered.
+    
+    Args:
+        con: Open Snowflake connection
+        email: Snowflake user (persisted results are only visible to their owner)
+        query_cache: QueryResultCache holding the last query IDs
+        check_cancelled: Optional cancellation checkpoint
+        partitions: Number of concurrent partition queries
+        partition_by: SKUEXTRACT column used to partition
+        timings: Optional list that receives per-partition timings
+        allow_reuse: False forces a new query
+        
+    Returns:
+        tuple: (DataFrame, description of the data source for reporting)
+    """
+    timings = timings if timings is not None else []
+    cached = query_cache.load(email, partitions, partition_by) if allow_reuse else None
+    if cached:
+        # Results of a query that ran before the table was last loaded are stale
+        last_altered = velocity_table_last_altered(con)
+        if last_altered is None or last_altered >= datetime.fromisoformat(cached['executed_at']):
+            cached = None
+    if cached:
+        try:
+            velocity_data = fetch_velocity_data(
+                con, check_cancelled, timings=timings, reuse_query_ids=cached['query_ids']
+            )
+            executed_at = datetime.fromisoformat(cached['executed_at'])
+            return velocity_data, (
+                f"Reused Snowflake results from {executed_at:%Y-%m-%d %H:%M} "
+                f"(no warehouse scan)"
+            )
+        except PipelineCancelled:
+            raise
+        except Exception:
+            # Persisted results expired or are not accessible - run the query again
+            timings.clear()
+            query_cache.clear()
+            
+    submitted_at = datetime.now()
+    velocity_data = fetch_velocity_data(
+        con, check_cancelled, partitions=partitions, partition_by=partition_by, timings=timings
+    )
+    query_cache.save(
+        email, [timing['query_id'] for timing in timings], partitions, partition_by, submitted_at
+    )
+    return velocity_data, "New Snowflake query"
+
+
+def format_fetch_timings(timings):
+    """
+    Format per-partition fetch timings for display.
+    
+    Args:
+        timings: Timing dicts collected by fetch_velocity_data
+        
+    Returns:
+        str: One line per partition
+    """
+    return "\n".join(
+        f"• Partition {timing['partition']}: {timing['rows']:,} rows, "
+        f"query {timing['query_seconds']:.1f}s, download {timing['fetch_seconds']:.1f}s"
+        for timing in timings
+    )
+
+
+def to_categorical(df, columns):
+    """Convert the given columns (where present) to the category dtype in place"""
+    for column in columns:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+    return df
+
+
+def normalize_velocity_keys(velocity_data):
+    """
+    Prepare velocity data for merging, in place.
+    
+    Converts the JDA_ITEM/JDA_LOC merge keys to strings and stores
+    UDC_VELOCITY_CODE as a categorical. Arrow downloads numeric keys as typed
+    columns (float64 when a partition holds nulls), so they get the same
+    whole-number handling as input keys.
+    """
+    for column in INPUT_KEY_COLUMNS:
+        velocity_data[column] = input_key_strings(velocity_data[column]).astype(str)
+    to_categorical(velocity_data, ['UDC_VELOCITY_CODE'])
+    return velocity_data
+
+
+def build_dcsku(dc, usn):
+    """
+    Concatenate DC + USN into an Arrow-backed string column.
+    
+    The join happens in Arrow memory, so no per-row Python string objects are
+    created for DC, USN or the result. Falls back to plain string
+    concatenation for columns Arrow cannot convert.
+    
+    DCSKU is missing (<NA>) when DC or USN is missing, and whole-number float
+    USNs (read as 12345.0 when the column has blanks) have no ".0" suffix.
+    
+    Args:
+        dc: DC column (categorical or plain)
+        usn: USN column
+        
+    Returns:
+        Series: DCSKU values aligned with dc
+        
+    Examples:
+        >>> dc = pd.Series(['D1', 'D1', None, 'D2'], dtype='category')
+        >>> usn = pd.Series([12345.0, None, 678.0, 9.0])
+        >>> build_dcsku(dc, usn).tolist()
+        ['D112345', <NA>, <NA>, 'D29']
+        >>> build_dcsku(pd.Series(['D1', 'D2']), pd.Series([12345, 678])).tolist()
+        ['D112345', 'D2678']
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    
+    try:
+        parts = []
+        for series in (dc, usn):
+            array = pa.Array.from_pandas(series)
+            if pa.types.is_dictionary(array.type):
+                array = array.dictionary_decode()
+            parts.append(pc.cast(array, pa.string()))
+        joined = pc.binary_join_element_wise(parts[0], parts[1], "")
+        return pd.Series(pd.arrays.ArrowStringArray(joined), index=dc.index)
+    except (pa.ArrowException, TypeError, ValueError):
+        dcsku = dc.astype(str) + usn.astype(str)
+        return dcsku.where(dc.notna() & usn.notna())
+
+
+def merge_velocity_data(df, velocity_data):
+    """
+    Look up current velocity codes for each input row (VLOOKUP on JDA_ITEM + JDA_LOC).
+    
+    Adds the In_Snowflake column (True where the key exists in the velocity
+    data, even if its velocity code is blank) and the DCSKU column (DC + USN)
+    when both source columns are present.
+    PROPOSED_VELOCITY and DC are converted to categoricals before merging so
+    the merged frame never holds them as object columns.
+    
+    Args:
+        df: Input data with JDA_ITEM and JDA_LOC columns
+        velocity_data: Velocity data with string merge keys (see normalize_velocity_keys)
+        
+    Returns:
+        DataFrame: Input rows with UDC_VELOCITY_CODE, In_Snowflake (and DCSKU) added
+    """
+    # Convert merge columns to string type to ensure compatibility
+    df['JDA_ITEM'] = df['JDA_ITEM'].astype(str)
+    df['JDA_LOC'] = df['JDA_LOC'].astype(str)
+    to_categorical(df, ['PROPOSED_VELOCITY', 'DC'])
+    
+    df_merged = df.merge(
+        velocity_data,
+        on=['JDA_ITEM', 'JDA_LOC'],
+        how='left',
+        indicator='_velocity_merge'
+    )
+    df_merged[FOUND_COLUMN] = (df_merged['_velocity_merge'] == 'both').to_numpy()
+    df_merged.drop(columns='_velocity_merge', inplace=True)
+    
+    # Add DCSKU column (concatenate DC + USN)
+    if 'DC' in df_merged.columns and 'USN' in df_merged.columns:
+        df_merged['DCSKU'] = build_dcsku(df_merged['DC'], df_merged['USN'])
+    return df_merged
+
+
+def compare_velocities(df_merged):
+    """
+    Add the Current_Velocity and Match columns to merged data.
+    
+    Match is False when PROPOSED_VELOCITY is missing from the input or either
+    velocity is blank. Both velocities are compared as category codes over a
+    shared category set, without materializing per-row values.
+    
+    Args:
+        df_merged: Output of merge_velocity_data
+        
+    Returns:
+        DataFrame: The same frame with Current_Velocity and Match columns
+    """
+    # Rename UDC_VELOCITY_CODE to Current_Velocity if it exists
+    if 'UDC_VELOCITY_CODE' in df_merged.columns:
+        df_merged.rename(columns={'UDC_VELOCITY_CODE': 'Current_Velocity'}, inplace=True)
+    else:
+        # Column not found, create empty Current_Velocity column
+        df_merged['Current_Velocity'] = None
+    
+    if 'PROPOSED_VELOCITY' in df_merged.columns:
+        to_categorical(df_merged, ['Current_Velocity', 'PROPOSED_VELOCITY'])
+        current = df_merged['Current_Velocity']
+        proposed = df_merged['PROPOSED_VELOCITY']
+        categories = current.cat.categories.union(proposed.cat.categories, sort=False)
+        current_codes = current.cat.set_categories(categories).cat.codes.to_numpy()
+        proposed_codes = proposed.cat.set_categories(categories).cat.codes.to_numpy()
+        # Code -1 marks a blank value, which never matches
+        df_merged['Match'] = (current_codes == proposed_codes) & (current_codes != -1)
+    else:
+        df_merged['Match'] = False
+    return df_merged
+
+
+def process_memory_mb():
+    """
+    Return the current and peak memory of this process in MB.
+    
+    Current is the working set (Windows) or resident set size (Linux); peak is
+    the largest it has been since the process started. Peaks are never reset,
+    so compare readings taken before and after a run to see whether that run
+    raised the peak.
+    
+    Returns:
+        tuple: (current, peak); either is None if it cannot be determined
+    """
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+            
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+                
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            process = ctypes.windll.kernel32.GetCurrentProcess()
+            if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+                return None, None
+            return counters.WorkingSetSize / (1024 * 1024), counters.PeakWorkingSetSize / (1024 * 1024)
+            
+        # Linux reports both in /proc (values in kB)
+        if os.path.exists("/proc/self/status"):
+            values = {}
+            with open("/proc/self/status") as status_file:
+                for line in status_file:
+                    key, _, value = line.partition(":")
+                    if key in ("VmRSS", "VmHWM"):
+                        values[key] = int(value.split()[0]) / 1024
+            return values.get("VmRSS"), values.get("VmHWM")
+            
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        return None, peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except Exception:
+        return None, None
+
+
+def format_memory_report(before, after):
+    """
+    Describe a run's memory use from process_memory_mb readings.
+    
+    The process peak only identifies this run's peak when the run raised it;
+    otherwise the run stayed at or below a peak set earlier (e.g. by a
+    previous run in the same session).
+    
+    Args:
+        before: (current, peak) taken before the run
+        after: (current, peak) taken after the run
+        
+    Returns:
+        str: Bullet lines, or an empty string if nothing could be measured
+    """
+    (current_before, peak_before), (current_after, peak_after) = before, after
+    lines = []
+    if current_before is not None:
+        lines.append(f"• In use before run: {current_before:,.0f} MB")
+    if current_after is not None:
+        lines.append(f"• In use after run: {current_after:,.0f} MB")
+    if peak_after is not None:
+        if peak_before is None or peak_after > peak_before:
+            lines.append(f"• Peak during run: {peak_after:,.0f} MB")
+        else:
+            lines.append(f"• Peak during run: at most {peak_after:,.0f} MB (process peak from an earlier run)")
+    return "\n".join(lines)
+
+
+def wait_for_futures(futures, check_cancelled=None):
+    """
+    Wait for futures in order, calling check_cancelled between polls.
+    
+    Args:
+        futures: Futures to wait for
+        check_cancelled: Optional callable raising PipelineCancelled
+        
+    Returns:
+        list: Results in the same order as futures
+    """
+    results = []
+    for future in futures:
+        while True:
+            if check_cancelled:
+                check_cancelled()
+            try:
+                results.append(future.result(timeout=QUERY_POLL_SECONDS))
+                break
+            except FuturesTimeoutError:
+                continue
+    return results
+
+
+def shutdown_process_pool(executor, futures, completed):
+    """
+    Shut down a worker process pool.
+    
+    After a cancelled or failed run, queued work is dropped and running
+    workers are terminated instead of being allowed to finish their task,
+    so their memory is released right away.
+    
+    Args:
+        executor: ProcessPoolExecutor to shut down
+        futures: Futures submitted to the executor
+        completed: True if all work finished normally
+    """
+    if completed:
+        executor.shutdown(wait=True)
+        return
+        
+    for future in futures:
+        future.cancel()
+    # Worker processes are not exposed publicly; terminate the ones still running
+    for process in list((getattr(executor, '_processes', None) or {}).values()):
+        if process.is_alive():
+            process.terminate()
+    if sys.version_info >= (3, 9):
+        executor.shutdown(wait=False, cancel_futures=True)
+    else:
+        executor.shutdown(wait=False)
+
+
+def find_validation_sheets(file_path):
+    """
+    List the worksheets of an Excel file whose header has JDA_ITEM and JDA_LOC.
+    
+    Only the header row of each sheet is read.
+    
+    Args:
+        file_path: Path of the Excel workbook
+        
+    Returns:
+        list: Sheet names in workbook order
+    """
+    with pd.ExcelFile(file_path) as workbook:
+        return [
+            sheet_name for sheet_name in workbook.sheet_names
+            if set(INPUT_KEY_COLUMNS).issubset(workbook.parse(sheet_name, nrows=0).columns)
+        ]
+
+
+def input_key_strings(values):
+    """
+    Convert an input key column to strings, without a float ".0" suffix.
+    
+    A blank cell makes pandas read a numeric key column as float64 (1 -> 1.0);
+    whole-number floats are converted back to integers first so the keys
+    still match Snowflake. Blank keys stay missing.
+    
+    Args:
+        values: JDA_ITEM or JDA_LOC column as read from the input file
+        
+    Returns:
+        Series: String keys (NaN where the key is blank)
+    """
+    present = values.notna()
+    if pd.api.types.is_float_dtype(values) and (values[present] % 1 == 0).all():
+        return values.astype('Int64').astype(str).where(present)
+    return values.astype(str).where(present)
+
+
+def normalize_input_keys(df):
+    """Convert the JDA_ITEM/JDA_LOC columns of an input frame to string keys, in place"""
+    for column in INPUT_KEY_COLUMNS:
+        if column in df.columns:
+            df[column] = input_key_strings(df[column])
+    return df
+
+
+def read_input_sheet(file_path, sheet_name):
+    """
+    Read one worksheet of an input workbook (runs in a worker process).
+    
+    Keys are converted to strings per sheet, so a blank key on one sheet
+    cannot turn the keys of every sheet into floats when they are stacked.
+    """
+    return normalize_input_keys(pd.read_excel(file_path, sheet_name=sheet_name))
+
+
+def load_input_file(file_path, check_cancelled=None):
+    """
+    Read an input Excel/CSV file into a DataFrame.
+    
+    Every worksheet that carries JDA_ITEM and JDA_LOC is loaded; when there are
+    several, they are parsed concurrently in worker processes and stacked into
+    one frame with a SOURCE_SHEET column, so all sheets are validated against
+    the same velocity lookup. Workbooks with no such sheet load their first
+    sheet, which then fails the column check as before. JDA_ITEM/JDA_LOC are
+    returned as string keys (see input_key_strings).
+    
+    Args:
+        file_path: Path of the input file
+        check_cancelled: Optional callable raising PipelineCancelled
+        
+    Returns:
+        DataFrame: Input rows (with SOURCE_SHEET for multi-sheet workbooks)
+    """
+    if file_path.endswith('.csv'):
+        return normalize_input_keys(pd.read_csv(file_path))
+        
+    sheet_names = find_validation_sheets(file_path)
+    if len(sheet_names) <= 1:
+        return read_input_sheet(file_path, sheet_names[0] if sheet_names else 0)
+        
+    max_workers = max(1, min(len(sheet_names), os.cpu_count() or 1))
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+    futures = []
+    completed = False
+    try:
+        futures = [
+            executor.submit(read_input_sheet, file_path, sheet_name) for sheet_name in sheet_names
+        ]
+        frames = wait_for_futures(futures, check_cancelled)
+        completed = True
+    finally:
+        shutdown_process_pool(executor, futures, completed)
+        
+    for sheet_name, frame in zip(sheet_names, frames):
+        frame.insert(0, SOURCE_SHEET_COLUMN, sheet_name)
+    df = pd.concat(frames, ignore_index=True)
+    del frames
+    df[SOURCE_SHEET_COLUMN] = pd.Categorical(df[SOURCE_SHEET_COLUMN], categories=sheet_names)
+    return df
+
+
+def format_validation_sheet(worksheet, df, check_cancelled=None):
+    """
+    Apply HD Supply formatting to a data worksheet.
+    
+    Styles the header row, color-codes the Match column, highlights the
+    Current_Velocity column and auto-adjusts column widths.
+    
+    Args:
+        worksheet: openpyxl worksheet the DataFrame was written to
+        df: DataFrame that was written to the worksheet
+        check_cancelled: Optional callable raising PipelineCancelled, called
+            every FORMAT_CANCEL_CHECK_ROWS rows
+    """
+    from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+    
+    def checkpoint(row_idx):
+        if check_cancelled and row_idx % FORMAT_CANCEL_CHECK_ROWS == 0:
+            check_cancelled()
+    
+    # HD Supply color scheme
+    header_fill = PatternFill(start_color="000000", end_color="000000", fill_type="solid")
+    header_font = Font(color="FFD700", bold=True, size=11)
+    
+    yellow_fill = PatternFill(start_color="FFFACD", end_color="FFFACD", fill_type="solid")
+    red_fill = PatternFill(start_color="FFE6E6", end_color="FFE6E6", fill_type="solid")
+    green_fill = PatternFill(start_color="E6FFE6", end_color="E6FFE6", fill_type="solid")
+    
+    thin_border = Border(
+        left=Side(style='thin', color='CCCCCC'),
+        right=Side(style='thin', color='CCCCCC'),
+        top=Side(style='thin', color='CCCCCC'),
+        bottom=Side(style='thin', color='CCCCCC')
+    )
+    
+    # Format headers
+    for cell in worksheet[1]:
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal="center", vertical="center")
+        cell.border = thin_border
+    
+    # Highlight Match column
+    if 'Match' in df.columns:
+        match_col_idx = df.columns.get_loc('Match') + 1
+        for row_idx in range(2, len(df) + 2):
+            checkpoint(row_idx)
+            cell = worksheet.cell(row=row_idx, column=match_col_idx)
+            cell_value = cell.value
+    
+            if cell_value == False or cell_value == 'False':
+                cell.fill = red_fill
+                cell.font = Font(color="CC0000", bold=True)
+            elif cell_value == True or cell_value == 'True':
+                cell.fill = green_fill
+                cell.font = Font(color="006600", bold=True)
+    
+            cell.alignment = Alignment(horizontal="center", vertical="center")
+            cell.border = thin_border
+    
+    # Highlight Current_Velocity column
+    if 'Current_Velocity' in df.columns:
+        vel_col_idx = df.columns.get_loc('Current_Velocity') + 1
+        for row_idx in range(2, len(df) + 2):
+            checkpoint(row_idx)
+            cell = worksheet.cell(row=row_idx, column=vel_col_idx)
+            cell.fill = yellow_fill
+            cell.alignment = Alignment(horizontal="center", vertical="center")
+            cell.border = thin_border
+    
+    # Auto-adjust column widths
+    for column in worksheet.columns:
+        max_length = 0
+        column_letter = column[0].column_letter
+        for cell in column:
+            checkpoint(cell.row)
+            try:
+                if cell.value:
+                    max_length = max(max_length, len(str(cell.value)))
+            except:
+                pass
+        adjusted_width = min(max_length + 3, 50)
+        worksheet.column_dimensions[column_letter].width = adjusted_width
+    
+    
+def label_blanks(values):
+    """Replace missing labels with SUMMARY_BLANK_LABEL and return them as strings"""
+    return [SUMMARY_BLANK_LABEL if pd.isna(value) else str(value) for value in values]
+
+
+def validation_masks(df):
+    """
+    Boolean masks of mismatching rows and rows whose key is not in Snowflake.
+    
+    Not found comes from the In_Snowflake key-presence column, so keys that
+    exist with a blank velocity code are not counted. Data merged without that
+    column (older checkpoints) falls back to a blank Current_Velocity.
+    
+    Args:
+        df: Merged DataFrame with Current_Velocity and Match columns
+        
+    Returns:
+        tuple: (mismatch, not_found) numpy boolean arrays; all True when the
+        source column is missing
+    """
+    if 'Match' in df.columns:
+        mismatch = ~df['Match'].to_numpy(dtype=bool)
+    else:
+        mismatch = np.ones(len(df), dtype=bool)
+    if FOUND_COLUMN in df.columns:
+        not_found = ~df[FOUND_COLUMN].to_numpy(dtype=bool)
+    elif 'Current_Velocity' in df.columns:
+        not_found = df['Current_Velocity'].isna().to_numpy()
+    else:
+        not_found = np.ones(len(df), dtype=bool)
+    return mismatch, not_found
+
+
+def summarize_mismatches_by(df, column, mismatch, not_found):
+    """
+    Count records, mismatches and not-found keys per value of a column.
+    
+    Args:
+        df: Validated DataFrame
+        column: Column to group by (e.g. DC or JDA_LOC)
+        mismatch: Boolean array, True where Match is False
+        not_found: Boolean array, True where no current velocity was found
+        
+    Returns:
+        DataFrame: column, Records, Mismatches, Mismatch Rate, Not Found
+    """
+    flags = pd.DataFrame({'Mismatches': mismatch, 'Not Found': not_found}, index=df.index)
+    grouped = flags.groupby(df[column], observed=True, dropna=False, sort=True)
+    table = grouped.sum()
+    table.insert(0, 'Records', grouped.size())
+    table.insert(2, 'Mismatch Rate', table['Mismatches'] / table['Records'])
+    table.index = pd.Index(label_blanks(table.index), name=column)
+    return table.reset_index()
+
+
+def build_summary(df):
+    """
+    Compute the summary analytics for a validated DataFrame.
+    
+    Uses vectorized group-by operations only, so it stays fast on
+    million-row results. Rows whose key is missing from SKUEXTRACT are
+    counted as not found in Snowflake (see validation_masks).
+    
+    Args:
+        df: Merged DataFrame with Current_Velocity and Match columns
+        
+    Returns:
+        dict: DataFrames keyed by
+            overview: Statistics/Count rows (totals, matches, mismatches, not found)
+            transitions: PROPOSED_VELOCITY x Current_Velocity record counts
+            by_dc: Mismatch counts and rates per DC
+            by_loc: Mismatch counts and rates per JDA_LOC
+            by_sheet: Mismatch counts and rates per input worksheet
+            Tables whose source columns are missing are None.
+    """
+    total_records = len(df)
+    mismatch, not_found = validation_masks(df)
+    mismatches = int(mismatch.sum())
+    
+    overview = pd.DataFrame({
+        'Statistics': ['Total Records', 'Matches', 'Mismatches', 'Not Found in Snowflake'],
+        'Count': [total_records, total_records - mismatches, mismatches, int(not_found.sum())]
+    })
+    
+    # Proposed x current velocity transition matrix
+    transitions = None
+    if 'PROPOSED_VELOCITY' in df.columns and 'Current_Velocity' in df.columns:
+        counts = df.groupby(
+            ['PROPOSED_VELOCITY', 'Current_Velocity'], observed=True, dropna=False, sort=True
+        ).size()
+        matrix = counts.unstack(fill_value=0)
+        matrix.index = pd.Index(label_blanks(matrix.index), name='PROPOSED_VELOCITY')
+        matrix.columns = label_blanks(matrix.columns)
+        transitions = matrix.reset_index()
+        
+    by_dc = summarize_mismatches_by(df, 'DC', mismatch, not_found) if 'DC' in df.columns else None
+    by_loc = summarize_mismatches_by(df, 'JDA_LOC', mismatch, not_found) if 'JDA_LOC' in df.columns else None
+    by_sheet = None
+    if SOURCE_SHEET_COLUMN in df.columns:
+        by_sheet = summarize_mismatches_by(df, SOURCE_SHEET_COLUMN, mismatch, not_found)
+    
+    return {
+        'overview': overview,
+        'transitions': transitions,
+        'by_dc': by_dc,
+        'by_loc': by_loc,
+        'by_sheet': by_sheet
+    }
+
+
+def write_summary_sheet(summary_sheet, summary):
+    """
+    Lay out the summary tables on a worksheet, writing each cell in place.
+    
+    Sections: title, overview, velocity transition matrix (proposed rows x
+    current columns, matches on the diagonal highlighted), and mismatches
+    per input sheet, per DC and per JDA_LOC.
+    
+    Args:
+        summary_sheet: Empty openpyxl worksheet
+        summary: Output of build_summary
+    """
+    from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+    from openpyxl.utils import get_column_letter
+    
+    # HD Supply branded styles
+    title_font = Font(color="FFD700", bold=True, size=14)
+    section_font = Font(color="000000", bold=True, size=12)
+    header_fill = PatternFill(start_color="000000", end_color="000000", fill_type="solid")
+    header_font = Font(color="FFD700", bold=True, size=12)
+    
+    data_font = Font(size=11, bold=True)
+    number_fill = PatternFill(start_color="FFFACD", end_color="FFFACD", fill_type="solid")
+    match_fill = PatternFill(start_color="E6FFE6", end_color="E6FFE6", fill_type="solid")
+    center = Alignment(horizontal="center", vertical="center")
+    
+    thin_border = Border(
+        left=Side(style='thin', color='CCCCCC'),
+        right=Side(style='thin', color='CCCCCC'),
+        top=Side(style='thin', color='CCCCCC'),
+        bottom=Side(style='thin', color='CCCCCC')
+    )
+    
+    def write_header(row, labels):
+        for col_idx, label in enumerate(labels, start=1):
+            cell = summary_sheet.cell(row=row, column=col_idx, value=label)
+            cell.fill = header_fill
+            cell.font = header_font
+            cell.alignment = center
+            cell.border = thin_border
+            
+    def write_table(row, title, table, header=None, highlight_diagonal=False):
+        summary_sheet.cell(row=row, column=1, value=title).font = section_font
+        write_header(row + 1, header or list(table.columns))
+        row += 2
+        for values in table.itertuples(index=False):
+            for col_idx, value in enumerate(values, start=1):
+                if isinstance(value, np.generic):
+                    value = value.item()
+                cell = summary_sheet.cell(row=row, column=col_idx, value=value)
+                cell.font = data_font
+                cell.border = thin_border
+                cell.alignment = center
+                if col_idx == 1:
+                    continue
+                cell.fill = number_fill
+                if isinstance(value, float):
+                    cell.number_format = '0.0%'
+                else:
+                    cell.number_format = '#,##0'
+                # Matching proposed/current velocities sit where row label == column label
+                if highlight_diagonal and table.columns[col_idx - 1] == values[0]:
+                    cell.fill = match_fill
+            row += 1
+        return row + 1
+        
+    widest = max(len(table.columns) for table in summary.values() if table is not None)
+    
+    # Title row
+    summary_sheet['A1'] = 'VELOCITY VALIDATION SUMMARY'
+    summary_sheet.merge_cells(start_row=1, start_column=1, end_row=1, end_column=max(2, widest))
+    title_cell = summary_sheet['A1']
+    title_cell.font = title_font
+    title_cell.fill = header_fill
+    title_cell.alignment = center
+    
+    row = write_table(3, 'OVERVIEW', summary['overview'])
+    if summary['transitions'] is not None:
+        transitions = summary['transitions']
+        row = write_table(
+            row, 'VELOCITY TRANSITIONS (PROPOSED → CURRENT)', transitions,
+            header=['Proposed \\ Current'] + list(transitions.columns[1:]),
+            highlight_diagonal=True
+        )
+    if summary['by_sheet'] is not None:
+        row = write_table(row, 'MISMATCHES BY INPUT SHEET', summary['by_sheet'])
+    if summary['by_dc'] is not None:
+        row = write_table(row, 'MISMATCHES BY DC', summary['by_dc'])
+    if summary['by_loc'] is not None:
+        row = write_table(row, 'MISMATCHES BY JDA_LOC', summary['by_loc'])
+        
+    # Set column widths for summary
+    summary_sheet.column_dimensions['A'].width = 26
+    for col_idx in range(2, widest + 1):
+        summary_sheet.column_dimensions[get_column_letter(col_idx)].width = 15
+
+
+@contextmanager
+def excel_report_writer(output_path):
+    """
+    ExcelWriter that only creates output_path once the block completes.
+    
+    The workbook is serialized into memory and then written to disk. If the
+    block raises (e.g. the run was cancelled), the workbook is discarded
+    without spending time serializing it and no partial file is left behind.
+    
+    Args:
+        output_path: Destination workbook path
+        
+    Yields:
+        pd.ExcelWriter: openpyxl-backed writer
+    """
+    buffer = io.BytesIO()
+    writer = pd.ExcelWriter(buffer, engine='openpyxl')
+    yield writer
+    writer.close()
+    with open(output_path, 'wb') as output_file:
+        output_file.write(buffer.getbuffer())
+
+
+def write_data_sheet(writer, df, sheet_name, check_cancelled=None):
+    """
+    Write a DataFrame to a worksheet, checking for cancellation between row chunks.
+    
+    Args:
+        writer: Open pd.ExcelWriter
+        df: DataFrame to write (header + rows)
+        sheet_name: Worksheet name
+        check_cancelled: Optional callable raising PipelineCancelled
+    """
+    if check_cancelled is None:
+        df.to_excel(writer, sheet_name=sheet_name, index=False)
+        return
+        
+    df.iloc[:0].to_excel(writer, sheet_name=sheet_name, index=False)
+    for start in range(0, len(df), FORMAT_CANCEL_CHECK_ROWS):
+        check_cancelled()
+        df.iloc[start:start + FORMAT_CANCEL_CHECK_ROWS].to_excel(
+            writer, sheet_name=sheet_name, index=False, header=False, startrow=start + 1
+        )
+
+
+def write_excel_shard(df, output_path, sheet_name='Velocity Validation'):
+    """
+    Write one formatted data shard to its own workbook.
+    
+    Runs in a worker process, so it only depends on module-level code. The
+    workbook is written in openpyxl's write-only mode with pre-styled cells,
+    so memory stays flat however many rows the shard has.
+    
+    Args:
+        df: Shard of the validated DataFrame
+        output_path: Destination workbook path
+        sheet_name: Name of the data worksheet
+        
+    Returns:
+        str: The output path that was written
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import NamedStyle, PatternFill, Font, Alignment, Border, Side
+    from openpyxl.utils import get_column_letter
+    
+    # Write-only workbooks stream rows to disk instead of holding every cell
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(sheet_name)
+    
+    # Same HD Supply styling as format_validation_sheet, registered once as
+    # named styles so each streamed cell only copies a style index
+    center = Alignment(horizontal="center", vertical="center")
+    thin_border = Border(
+        left=Side(style='thin', color='CCCCCC'),
+        right=Side(style='thin', color='CCCCCC'),
+        top=Side(style='thin', color='CCCCCC'),
+        bottom=Side(style='thin', color='CCCCCC')
+    )
+    styles = {
+        'header': (PatternFill(start_color="000000", end_color="000000", fill_type="solid"),
+                   Font(color="FFD700", bold=True, size=11)),
+        'match': (PatternFill(start_color="E6FFE6", end_color="E6FFE6", fill_type="solid"),
+                  Font(color="006600", bold=True)),
+        'mismatch': (PatternFill(start_color="FFE6E6", end_color="FFE6E6", fill_type="solid"),
+                     Font(color="CC0000", bold=True)),
+        'blank': (PatternFill(), Font()),
+        'current': (PatternFill(start_color="FFFACD", end_color="FFFACD", fill_type="solid"), Font()),
+    }
+    for name, (fill, font) in styles.items():
+        workbook.add_named_style(NamedStyle(
+            name=f"vv_{name}", fill=fill, font=font, alignment=center, border=thin_border
+        ))
+        
+    def styled(value, style):
+        cell = WriteOnlyCell(worksheet, value=value)
+        cell.style = f"vv_{style}"
+        return cell
+    
+    columns = [str(column) for column in df.columns]
+    
+    # Column widths must be set before rows are streamed
+    for col_idx, column in enumerate(df.columns, start=1):
+        values = df[column].dropna().astype(str)
+        max_length = max(len(columns[col_idx - 1]), int(values.str.len().max()) if len(values) else 0)
+        worksheet.column_dimensions[get_column_letter(col_idx)].width = min(max_length + 3, 50)
+        
+    worksheet.append([styled(column, 'header') for column in columns])
+    
+    match_idx = columns.index('Match') if 'Match' in columns else None
+    velocity_idx = columns.index('Current_Velocity') if 'Current_Velocity' in columns else None
+    values = df.astype(object).where(df.notna(), None)
+    for row in values.itertuples(index=False, name=None):
+        row = list(row)
+        if match_idx is not None:
+            value = row[match_idx]
+            style = 'blank' if value is None else ('match' if value else 'mismatch')
+            row[match_idx] = styled(value, style)
+        if velocity_idx is not None:
+            row[velocity_idx] = styled(row[velocity_idx], 'current')
+        worksheet.append(row)
+        
+    workbook.save(output_path)
+    return output_path
+
+
+def output_tab_name(sheet_name):
+    """Name of the output tab for an input sheet, avoiding the Summary tab"""
+    name = str(sheet_name)[:31]
+    # Excel sheet names are case-insensitive
+    return f"{name[:21]} (input)" if name.lower() == 'summary' else name
+
+
+def sanitize_filename_part(value):
+    """Replace characters that are not safe in file names with underscores"""
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', str(value))
+
+
+class OutputWriter:
+    """
+    Write validated data in the selected output format.
+    
+    Shared by the GUI and the validation service so both produce identical
+    files. Holds the per-run output options.
+    
+    Args:
+        include_mismatch_report: Also write a branded mismatches-only Excel report
+            alongside flat-file output
+        excel_split_by: How oversized Excel reports are sharded (see EXCEL_SPLIT_OPTIONS)
+        check_cancelled: Optional cancellation checkpoint called between files
+    """
+    def __init__(self, include_mismatch_report=False, excel_split_by=EXCEL_SPLIT_OPTIONS[0],
+                 check_cancelled=None):
+        self.include_mismatch_report = include_mismatch_report
+        self.excel_split_by = excel_split_by
+        self.check_cancelled = check_cancelled or (lambda: None)
+        
+    def save_output(self, df, output_path, format_key):
+        """
+        Save the validated data in the selected output format.
+        
+        Flat-file formats (CSV, Parquet, Arrow) write the full annotated data
+        plus companion summary files and skip cell-by-cell Excel styling, which
+        keeps multi-million row validations fast. The branded Excel report can
+        be limited to mismatches only, and is sharded across workbooks when it
+        exceeds Excel's row limit.
+        
+        Args:
+            df: Merged DataFrame with Current_Velocity, DCSKU and Match columns
+            output_path: Path of the main output file
+            format_key: One of the format keys in OUTPUT_FORMATS
+            
+        Returns:
+            list: Paths of all files written
+        """
+        summary = build_summary(df)
+        
+        if format_key == "excel":
+            return self.save_excel_report(df, output_path, summary)
+        
+        if format_key == "excel_mismatches":
+            return self.save_excel_report(self.mismatch_rows(df), output_path, summary)
+        
+        base_path, extension = os.path.splitext(output_path)
+        self.save_flat_file(df, output_path, format_key)
+        output_files = [output_path]
+        
+        # One companion file per summary table
+        for key, suffix in SUMMARY_FILES:
+            if summary[key] is None:
+                continue
+            self.check_cancelled()
+            summary_path = f"{base_path}{suffix}{extension}"
+            self.save_flat_file(summary[key], summary_path, format_key)
+            output_files.append(summary_path)
+        
+        # Optional branded report limited to mismatches
+        if self.include_mismatch_report:
+            self.check_cancelled()
+            report_path = f"{base_path}_Mismatches.xlsx"
+            output_files.extend(self.save_excel_report(self.mismatch_rows(df), report_path, summary))
+            
+        return output_files
+        
+    def mismatch_rows(self, df):
+        """Return only the rows whose Match value is False"""
+        if 'Match' not in df.columns:
+            return df
+        return df[~df['Match'].astype(bool)]
+        
+    def save_flat_file(self, df, output_path, format_key):
+        """
+        Write a DataFrame to CSV, Parquet or Arrow (Feather) without formatting.
+        
+        Args:
+            df: DataFrame to write
+            output_path: Destination file path
+            format_key: 'csv', 'parquet' or 'arrow'
+        """
+        if format_key == "csv":
+            df.to_csv(output_path, index=False)
+        elif format_key == "parquet":
+            df.to_parquet(output_path, index=False)
+        elif format_key == "arrow":
+            df.reset_index(drop=True).to_feather(output_path)
+        else:
+            raise ValueError(f"Unsupported output format: {format_key}")
+            
+    def save_excel_report(self, df, output_path, summary):
+        """
+        Save the branded Excel report, sharding it when it exceeds one worksheet.
+        
+        Multi-sheet input gets one output tab per input sheet as long as every
+        sheet fits on a worksheet.
+        
+        Args:
+            df: DataFrame to write
+            output_path: Path of the report workbook
+            summary: Summary tables computed from the full data (see build_summary)
+            
+        Returns:
+            list: Paths of all workbooks written
+        """
+        if SOURCE_SHEET_COLUMN in df.columns:
+            sheet_rows = df[SOURCE_SHEET_COLUMN].value_counts()
+            if len(sheet_rows) and sheet_rows.max() <= EXCEL_SHARD_ROWS:
+                self.save_sheet_tabs_excel(df, output_path, summary)
+                return [output_path]
+        if len(df) <= EXCEL_SHARD_ROWS:
+            self.save_formatted_excel(df, output_path, summary)
+            return [output_path]
+        return self.save_sharded_excel(df, output_path, summary)
+        
+    def split_excel_shards(self, df, split_by):
+        """
+        Split a DataFrame into shards that each fit on a single worksheet.
+        
+        Args:
+            df: DataFrame to split
+            split_by: 'DC' to split per distribution center first, otherwise by row count
+            
+        Returns:
+            list: (label, DataFrame) tuples in output order
+        """
+        if split_by == "DC" and 'DC' in df.columns:
+            groups = [
+                (f"DC_{'blank' if pd.isna(dc) else dc}", group)
+                for dc, group in df.groupby('DC', sort=True, dropna=False, observed=True)
+            ]
+        else:
+            groups = [("Part", df)]
+            
+        shards = []
+        for label, group in groups:
+            # Large groups are further split into worksheet-sized chunks
+            chunk_count = max(1, -(-len(group) // EXCEL_SHARD_ROWS))
+            for chunk_idx in range(chunk_count):
+                chunk = group.iloc[chunk_idx * EXCEL_SHARD_ROWS:(chunk_idx + 1) * EXCEL_SHARD_ROWS]
+                if label == "Part" or chunk_count > 1:
+                    shard_label = f"{label}{len(shards) + 1:02d}" if label == "Part" else f"{label}_{chunk_idx + 1:02d}"
+                else:
+                    shard_label = label
+                shards.append((shard_label, chunk))
+        return shards
+        
+    def save_sharded_excel(self, df, output_path, summary):
+        """
+        Save a large report as multiple formatted workbooks written in parallel.
+        
+        Each shard is formatted and written in a worker process, at most
+        EXCEL_SHARD_WORKERS at a time to bound memory. A separate
+        Summary workbook holds the consolidated statistics and lists every shard.
+        
+        Args:
+            df: DataFrame to write
+            output_path: Base path of the report; shard names are derived from it
+            summary: Summary tables computed from the full data (see build_summary)
+            
+        Returns:
+            list: Summary workbook path followed by the shard workbook paths
+        """
+        base_path, extension = os.path.splitext(output_path)
+        shards = self.split_excel_shards(df, self.excel_split_by)
+        shard_paths = [
+            f"{base_path}_{sanitize_filename_part(label)}{extension}" for label, _ in shards
+        ]
+        
+        max_workers = max(1, min(len(shards), os.cpu_count() or 1, EXCEL_SHARD_WORKERS))
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+        futures = []
+        completed = False
+        try:
+            futures = [
+                executor.submit(write_excel_shard, shard_df, shard_path)
+                for (_, shard_df), shard_path in zip(shards, shard_paths)
+            ]
+            wait_for_futures(futures, self.check_cancelled)
+            completed = True
+        finally:
+            shutdown_process_pool(executor, futures, completed)
+            if not completed:
+                # A partial set of shards is not a usable report
+                for shard_path in shard_paths:
+                    if os.path.exists(shard_path):
+                        os.remove(shard_path)
+        self.check_cancelled()
+                
+        # Consolidated Summary workbook
+        summary_path = f"{base_path}_Summary{extension}"
+        shard_index = pd.DataFrame({
+            'File': [os.path.basename(path) for path in shard_paths],
+            'Rows': [len(shard_df) for _, shard_df in shards]
+        })
+        with pd.ExcelWriter(summary_path, engine='openpyxl') as writer:
+            write_summary_sheet(writer.book.create_sheet('Summary'), summary)
+            shard_index.to_excel(writer, sheet_name='Output Files', index=False)
+            format_validation_sheet(writer.sheets['Output Files'], shard_index)
+            
+        return [summary_path] + shard_paths
+        
+    def save_formatted_excel(self, df, output_path, summary=None):
+        """Save DataFrame to Excel with HD Supply formatting and Summary sheet"""
+        # A worksheet holds at most EXCEL_MAX_ROWS rows including the header
+        if len(df) > EXCEL_SHARD_ROWS:
+            raise ValueError(
+                f"{len(df):,} rows exceed Excel's limit of {EXCEL_SHARD_ROWS:,} data rows per sheet."
+            )
+            
+        if summary is None:
+            summary = build_summary(df)
+            
+        with excel_report_writer(output_path) as writer:
+            # Write main data sheet
+            write_data_sheet(writer, df, 'Velocity Validation', self.check_cancelled)
+            
+            # Apply HD Supply formatting to the data sheet
+            format_validation_sheet(writer.sheets['Velocity Validation'], df, self.check_cancelled)
+            
+            # Summary sheet is laid out cell by cell
+            write_summary_sheet(writer.book.create_sheet('Summary'), summary)
+            
+    def save_sheet_tabs_excel(self, df, output_path, summary):
+        """
+        Save multi-sheet results as one workbook with a tab per input sheet.
+        
+        Stacking the sheets gives every row the union of all sheets' columns,
+        so input columns that are entirely blank for a sheet are left off its
+        tab; key and validation columns are always kept.
+        
+        Args:
+            df: DataFrame with a SOURCE_SHEET column
+            output_path: Path of the report workbook
+            summary: Summary tables computed from the full data (see build_summary)
+        """
+        with excel_report_writer(output_path) as writer:
+            for sheet_name, sheet_df in df.groupby(SOURCE_SHEET_COLUMN, sort=False, observed=True):
+                self.check_cancelled()
+                tab_name = output_tab_name(sheet_name)
+                blank_columns = [
+                    column for column in sheet_df.columns
+                    if column not in SHEET_TAB_KEEP_COLUMNS and sheet_df[column].isna().all()
+                ]
+                sheet_df = sheet_df.drop(columns=[SOURCE_SHEET_COLUMN] + blank_columns)
+                write_data_sheet(writer, sheet_df, tab_name, self.check_cancelled)
+                format_validation_sheet(writer.sheets[tab_name], sheet_df, self.check_cancelled)
+                
+            # Combined summary across all sheets
+            write_summary_sheet(writer.book.create_sheet('Summary'), summary)
+
+
+class ResultsView:
+    """
+    Filtered, paged access to validated results for the results viewer.
+    
+    Status masks and compact DC codes are computed once, so switching filters
+    is a vectorized comparison and AND over arrays. Only the requested page of
+    rows is ever materialized.
+    
+    Args:
+        df: Merged DataFrame with Current_Velocity and Match columns
+    """
+    def __init__(self, df):
+        self.df = df
+        mismatch, not_found = validation_masks(df)
+        self.status_masks = {
+            RESULT_FILTERS[0]: None,
+            RESULT_FILTERS[1]: mismatch,
+            RESULT_FILTERS[2]: not_found
+        }
+        
+        # One small integer code per row (-1 for a blank DC); the DC mask is
+        # built on demand instead of keeping a full-length mask per DC
+        self.dc_codes = None
+        self.dc_index = {}
+        if 'DC' in df.columns:
+            codes, dc_values = pd.factorize(df['DC'], sort=True)
+            code_dtype = np.int8 if len(dc_values) <= np.iinfo(np.int8).max else np.int32
+            self.dc_codes = codes.astype(code_dtype)
+            self.dc_index = {str(dc): code for code, dc in enumerate(dc_values)}
+                
+        self.rows = np.arange(len(df))
+        
+    def dc_values(self):
+        """Return the DCs available for filtering"""
+        return list(self.dc_index)
+        
+    def apply_filter(self, status=RESULT_FILTERS[0], dc=RESULTS_ALL_DCS):
+        """
+        Select the rows matching a status filter and DC.
+        
+        Args:
+            status: One of RESULT_FILTERS
+            dc: DC value, or RESULTS_ALL_DCS for no DC filter
+            
+        Returns:
+            int: Number of rows selected
+        """
+        masks = [self.status_masks.get(status)]
+        if dc in self.dc_index:
+            masks.append(self.dc_codes == self.dc_index[dc])
+        masks = [mask for mask in masks if mask is not None]
+        if not masks:
+            self.rows = np.arange(len(self.df))
+        else:
+            self.rows = np.flatnonzero(np.logical_and.reduce(masks))
+        return len(self.rows)
+        
+    def page(self, start, count):
+        """Return count selected rows starting at position start"""
+        return self.df.iloc[self.rows[start:start + count]]
+        
+    def selected(self):
+        """Return a copy of all selected rows (used for export)"""
+        return self.df.iloc[self.rows]
+
+
+def window_height_for_screen(screen_height):
+    """
+    Return the starting main window height for a screen.
+    
+    Args:
+        screen_height: Screen height in pixels
+        
+    Returns:
+        int: WINDOW_HEIGHT, reduced to leave WINDOW_SCREEN_MARGIN on small screens
+    """
+    return min(WINDOW_HEIGHT, screen_height - WINDOW_SCREEN_MARGIN)
+
+
 class ModernButton(tk.Canvas):
     """
     Custom modern button widget with hover effects for HD Supply™ interface.
@@ -85,6 +1801,300 @@ class ModernButton(tk.Canvas):
         """Restore button color when mouse leaves"""
         self.itemconfig(self.rect, fill=self.bg_color)
 
+
+class ResultsViewer(tk.Toplevel):
+    """
+    Window for browsing validated results without opening the output file.
+    
+    The table is virtualized: the Treeview only ever holds one page of rows
+    (RESULTS_PAGE_ROWS, or as many as fit once the window is resized), and the
+    scrollbar is driven manually so scrolling re-renders the visible page from
+    the ResultsView instead of loading every row into the widget.
+    
+    Args:
+        app: Owning VelocityValidatorApp (colors, UI queue)
+        results: ResultsView over the merged data
+    """
+    def __init__(self, app, results):
+        super().__init__(app.root)
+        self.app = app
+        self.results = results
+        self.first_row = 0
+        self.page_rows = RESULTS_PAGE_ROWS
+        self.export_thread = None
+        
+        # Start at the default size, but never larger than the screen
+        width = min(RESULTS_WINDOW_WIDTH, self.winfo_screenwidth() - WINDOW_SCREEN_MARGIN)
+        height = min(RESULTS_WINDOW_HEIGHT, self.winfo_screenheight() - WINDOW_SCREEN_MARGIN)
+        self.title("Velocity Validation Results")
+        self.geometry(f"{width}x{height}")
+        self.resizable(True, True)
+        self.minsize(min(700, width), min(400, height))
+        self.configure(bg=app.bg_black)
+        self.transient(app.root)
+        
+        self.status_filter = tk.StringVar(value=RESULT_FILTERS[0])
+        self.dc_filter = tk.StringVar(value=RESULTS_ALL_DCS)
+        
+        self.setup_gui()
+        self.apply_filter()
+        
+    def setup_gui(self):
+        app = self.app
+        
+        # Header
+        header = tk.Label(
+            self,
+            text="🔎 Velocity Validation Results",
+            font=("Segoe UI", 16, "bold"),
+            bg=app.bg_black,
+            fg=app.hd_bright_yellow
+        )
+        header.pack(pady=(20, 10))
+        
+        separator = tk.Frame(self, bg=app.hd_yellow, height=2)
+        separator.pack(fill="x", padx=30, pady=(0, 15))
+        
+        # Filter row
+        filter_row = tk.Frame(self, bg=app.dark_gray, highlightbackground=app.medium_gray, highlightthickness=1)
+        filter_row.pack(fill="x", padx=30, pady=(0, 10))
+        
+        status_label = tk.Label(
+            filter_row,
+            text="Show:",
+            bg=app.dark_gray,
+            fg=app.hd_yellow,
+            font=("Segoe UI", 11, "bold")
+        )
+        status_label.pack(side="left", padx=(15, 8), pady=12)
+        
+        status_combo = ttk.Combobox(
+            filter_row,
+            textvariable=self.status_filter,
+            values=RESULT_FILTERS,
+            state="readonly",
+            width=24,
+            font=("Segoe UI", 11),
+            style="Yellow.TCombobox"
+        )
+        status_combo.pack(side="left", ipady=4)
+        status_combo.bind("<<ComboboxSelected>>", self.apply_filter)
+        
+        dc_label = tk.Label(
+            filter_row,
+            text="DC:",
+            bg=app.dark_gray,
+            fg=app.hd_yellow,
+            font=("Segoe UI", 11, "bold")
+        )
+        dc_label.pack(side="left", padx=(20, 8))
+        
+        dc_combo = ttk.Combobox(
+            filter_row,
+            textvariable=self.dc_filter,
+            values=[RESULTS_ALL_DCS] + self.results.dc_values(),
+            state="readonly",
+            width=14,
+            font=("Segoe UI", 11),
+            style="Yellow.TCombobox"
+        )
+        dc_combo.pack(side="left", ipady=4)
+        dc_combo.bind("<<ComboboxSelected>>", self.apply_filter)
+        
+        self.count_label = tk.Label(
+            filter_row,
+            text="",
+            bg=app.dark_gray,
+            fg=app.text_gray,
+            font=("Segoe UI", 10, "italic")
+        )
+        self.count_label.pack(side="left", padx=20)
+        
+        # Table showing one page of rows
+        table_frame = tk.Frame(self, bg=app.bg_black)
+        table_frame.pack(fill="both", expand=True, padx=30)
+        
+        columns = [str(column) for column in self.results.df.columns]
+        self.tree = ttk.Treeview(
+            table_frame,
+            columns=columns,
+            show="headings",
+            height=RESULTS_PAGE_ROWS,
+            selectmode="browse"
+        )
+        for column in columns:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=120, minwidth=80, stretch=False)
+        self.tree.tag_configure("match", background="#E6FFE6")
+        self.tree.tag_configure("mismatch", background="#FFE6E6")
+        
+        # The vertical scrollbar tracks the filtered row range, not the widget
+        self.v_scroll = tk.Scrollbar(table_frame, orient="vertical", command=self.on_scroll)
+        h_scroll = tk.Scrollbar(table_frame, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=h_scroll.set)
+        
+        self.v_scroll.pack(side="right", fill="y")
+        h_scroll.pack(side="bottom", fill="x")
+        self.tree.pack(side="left", fill="both", expand=True)
+        
+        # Mouse wheel (Windows/macOS and X11)
+        self.tree.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_to(self.first_row - RESULTS_WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_to(self.first_row + RESULTS_WHEEL_ROWS))
+        self.tree.bind("<Configure>", self.on_tree_resize)
+        
+        # Footer with position and export, packed ahead of the table so a
+        # smaller window shrinks the table rather than hiding the footer
+        footer = tk.Frame(self, bg=app.bg_black)
+        footer.pack(side="bottom", fill="x", padx=30, pady=15, before=table_frame)
+        
+        self.position_label = tk.Label(
+            footer,
+            text="",
+            bg=app.bg_black,
+            fg=app.text_gray,
+            font=("Segoe UI", 10)
+        )
+        self.position_label.pack(side="left")
+        
+        export_btn = ModernButton(
+            footer,
+            text="💾 EXPORT FILTERED",
+            command=self.export_filtered,
+            bg_color=app.hd_yellow,
+            fg_color=app.bg_black,
+            hover_color=app.hd_bright_yellow,
+            width=220,
+            height=44
+        )
+        export_btn.pack(side="right")
+        
+    def apply_filter(self, event=None):
+        """Re-select rows for the chosen filters and jump back to the top"""
+        selected = self.results.apply_filter(self.status_filter.get(), self.dc_filter.get())
+        self.count_label.config(text=f"{selected:,} of {len(self.results.df):,} records")
+        self.first_row = 0
+        self.render_page()
+        
+    def scroll_to(self, first_row):
+        """Show the page starting at first_row (clamped to the selection)"""
+        last_start = max(0, len(self.results.rows) - self.page_rows)
+        first_row = max(0, min(int(first_row), last_start))
+        if first_row != self.first_row:
+            self.first_row = first_row
+            self.render_page()
+            
+    def on_scroll(self, action, amount, unit=None):
+        """Scrollbar command: translate moveto/scroll requests into a first row"""
+        if action == "moveto":
+            self.scroll_to(float(amount) * len(self.results.rows))
+        elif action == "scroll":
+            step = self.page_rows if unit == "pages" else 1
+            self.scroll_to(self.first_row + int(amount) * step)
+            
+    def on_mouse_wheel(self, event):
+        """Scroll a few rows per wheel notch"""
+        direction = -1 if event.delta > 0 else 1
+        self.scroll_to(self.first_row + direction * RESULTS_WHEEL_ROWS)
+        return "break"
+        
+    def on_tree_resize(self, event):
+        """Fit the page to the table height after the window is resized"""
+        children = self.tree.get_children()
+        bbox = self.tree.bbox(children[0]) if children else None
+        if not bbox:
+            return
+        # bbox is (x, y, width, height) of the first row, below the headings
+        page_rows = max(1, (event.height - bbox[1]) // bbox[3])
+        if page_rows != self.page_rows:
+            self.page_rows = page_rows
+            self.first_row = max(0, min(self.first_row, len(self.results.rows) - page_rows))
+            self.render_page()
+            
+    def render_page(self):
+        """Replace the Treeview contents with the current page of rows"""
+        total = len(self.results.rows)
+        page = self.results.page(self.first_row, self.page_rows)
+        
+        self.tree.delete(*self.tree.get_children())
+        match_position = list(page.columns).index('Match') if 'Match' in page.columns else None
+        for values in page.itertuples(index=False, name=None):
+            tags = ()
+            if match_position is not None:
+                tags = ("match",) if values[match_position] else ("mismatch",)
+            display = ["" if pd.isna(value) else value for value in values]
+            self.tree.insert("", "end", values=display, tags=tags)
+            
+        if total:
+            self.v_scroll.set(self.first_row / total, (self.first_row + len(page)) / total)
+            self.position_label.config(
+                text=f"Rows {self.first_row + 1:,}-{self.first_row + len(page):,} of {total:,}"
+            )
+        else:
+            self.v_scroll.set(0, 1)
+            self.position_label.config(text="No matching records")
+            
+    def export_filtered(self):
+        """Save the filtered rows in a format chosen by file extension"""
+        if self.export_thread and self.export_thread.is_alive():
+            messagebox.showwarning("Export", "An export is already running!", parent=self)
+            return
+        if not len(self.results.rows):
+            messagebox.showwarning("Export", "No records match the current filter.", parent=self)
+            return
+            
+        output_path = filedialog.asksaveasfilename(
+            parent=self,
+            title="Export filtered results",
+            defaultextension=".xlsx",
+            initialfile=f"Velocity_Filtered_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+            filetypes=[
+                ("Excel report", "*.xlsx"),
+                ("CSV", "*.csv"),
+                ("Parquet", "*.parquet"),
+                ("Arrow / Feather", "*.arrow")
+            ]
+        )
+        if not output_path:
+            return
+            
+        extension = os.path.splitext(output_path)[1].lower()
+        format_key = next((key for key, ext in FORMAT_EXTENSIONS.items() if ext == extension), None)
+        if format_key is None:
+            messagebox.showerror("Export", f"Unsupported file type: {extension}", parent=self)
+            return
+            
+        # Copy the selection now so later filter changes don't affect the export
+        df = self.results.selected()
+        self.position_label.config(text=f"Exporting {len(df):,} rows...")
+        self.export_thread = threading.Thread(
+            target=self.export_thread_main, args=(df, output_path, format_key), daemon=True
+        )
+        self.export_thread.start()
+        
+    def export_thread_main(self, df, output_path, format_key):
+        """Write the exported rows in the background and report back through the UI queue"""
+        try:
+            output_files = OutputWriter().save_output(df, output_path, format_key)
+            output_list = "\n".join(f"• {os.path.basename(path)}" for path in output_files)
+            self.app.post_ui(lambda: messagebox.showinfo(
+                "Export Complete",
+                f"✓ Exported {len(df):,} records:\n\n{output_list}"
+            ))
+        except Exception as e:
+            error_msg = str(e)
+            self.app.post_ui(lambda: messagebox.showerror(
+                "Export Error",
+                f"Failed to export results:\n\n{error_msg}"
+            ))
+        finally:
+            self.app.post_ui(self.render_page_if_open)
+            
+    def render_page_if_open(self):
+        """Refresh the position label after an export unless the window was closed"""
+        if self.winfo_exists():
+            self.render_page()
+
 class VelocityValidatorApp:
     """
     Main application class for HD Supply™ Velocity Validator.
@@ -103,8 +2113,10 @@ class VelocityValidatorApp:
     def __init__(self, root):
         self.root = root
         self.root.title("HD Supply™ Velocity Validator")
-        self.root.geometry("900x750")
-        self.root.resizable(False, False)
+        window_height = window_height_for_screen(self.root.winfo_screenheight())
+        self.root.geometry(f"{WINDOW_WIDTH}x{window_height}")
+        self.root.resizable(False, True)
+        self.root.minsize(WINDOW_WIDTH, min(600, window_height))
         
         # Modern HD Supply color scheme - Black background with Yellow accents
         self.bg_black = "#000000"
@@ -121,12 +2133,36 @@ class VelocityValidatorApp:
         
         # Variables
         self.input_file_path = tk.StringVar()
+        self.output_format = tk.StringVar(value=next(iter(OUTPUT_FORMATS)))
+        self.include_mismatch_report = tk.BooleanVar(value=False)
+        self.excel_split_by = tk.StringVar(value=EXCEL_SPLIT_OPTIONS[0])
+        self.fetch_partitions = tk.StringVar(value="1")
+        self.partition_by = tk.StringVar(value=PARTITION_KEYS[0])
+        self.reuse_results = tk.BooleanVar(value=False)
         self.snowflake_data = None
+        self.fetch_timings = []
+        self.fetch_source = None
+        self.query_cache = QueryResultCache()
+        
+        # Results of the last completed run, browsable in the results viewer
+        self.results_view = None
+        self.results_window = None
+        
+        # Worker thread -> GUI event queue and cancellation flag
+        self.ui_queue = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.worker_thread = None
+        
+        # Stage checkpoints for resuming failed runs
+        self.checkpoints = CheckpointStore()
         
         # Configure custom styles
         self.setup_styles()
         self.setup_gui()
         
+        # Start the fixed-interval UI update pump
+        self.root.after(UI_POLL_MS, self.pump_ui_queue)
+        
     def setup_styles(self):
         """Setup custom ttk styles"""
         style = ttk.Style()
@@ -140,6 +2176,16 @@ class VelocityValidatorApp:
                        lightcolor=self.hd_yellow,
                        darkcolor=self.hd_yellow)
         
+        # Configure output format dropdown
+        style.configure("Yellow.TCombobox",
+                       fieldbackground=self.medium_gray,
+                       background=self.hd_yellow,
+                       foreground=self.hd_bright_yellow,
+                       arrowcolor=self.bg_black)
+        style.map("Yellow.TCombobox",
+                  fieldbackground=[('readonly', self.medium_gray)],
+                  foreground=[('readonly', self.hd_bright_yellow)])
+        
     def setup_gui(self):
         # Main container with padding
         main_container = tk.Frame(self.root, bg=self.bg_black)
@@ -185,7 +2231,7 @@ class VelocityValidatorApp:
         
         # Separator line
         separator = tk.Frame(main_container, bg=self.hd_yellow, height=2)
-        separator.pack(fill="x", padx=20, pady=(0, 20))
+        separator.pack(fill="x", padx=20, pady=(0, 15))
         
         # Content frame with padding
         content_frame = tk.Frame(main_container, bg=self.bg_black)
@@ -195,7 +2241,7 @@ class VelocityValidatorApp:
         self.create_section(content_frame, "STEP 1: SELECT FILE", 0)
         
         file_info_frame = tk.Frame(content_frame, bg=self.dark_gray, highlightbackground=self.medium_gray, highlightthickness=1)
-        file_info_frame.pack(fill="x", pady=(0, 20))
+        file_info_frame.pack(fill="x", pady=(0, 15))
         
         self.file_label = tk.Label(
             file_info_frame,
@@ -219,61 +2265,221 @@ class VelocityValidatorApp:
             width=220,
             height=48
         )
-        browse_btn.pack(pady=(12, 25))
+        browse_btn.pack(pady=(10, 15))
+        
+        # Snowflake connection section
+        self.create_section(content_frame, "STEP 2: SNOWFLAKE CONNECTION", 20)
+        
+        sf_frame = tk.Frame(content_frame, bg=self.dark_gray, highlightbackground=self.medium_gray, highlightthickness=1)
+        sf_frame.pack(fill="x", pady=(0, 15), padx=0)
+        
+        # Email input only
+        self.sf_inputs = {}
+        
+        field_frame = tk.Frame(sf_frame, bg=self.dark_gray)
+        field_frame.pack(fill="x", padx=25, pady=20)
+        
+        label = tk.Label(
+            field_frame,
+            text="✉️ HD Supply Email:",
+            bg=self.dark_gray,
+            fg=self.hd_yellow,
+            font=("Segoe UI", 11, "bold"),
+            width=18,
+            anchor="w"
+        )
+        label.pack(side="left", padx=(0, 10))
+        
+        entry = tk.Entry(
+            field_frame,
+            bg=self.medium_gray,
+            fg=self.hd_bright_yellow,
+            font=("Segoe UI", 11),
+            insertbackground=self.hd_yellow,
+            relief="solid",
+            bd=1,
+            highlightbackground=self.light_gray,
+            highlightcolor=self.hd_yellow,
+            highlightthickness=1
+        )
+        entry.pack(side="left", fill="x", expand=True, ipady=10, ipadx=12)
+        entry.insert(0, "your.email@hdsupply.com")
+        self.sf_inputs['email'] = entry
+        
+        # Info label with icon
+        info_label = tk.Label(
+            sf_frame,
+            text="🔒 Authentication will open in your browser automatically",
+            bg=self.dark_gray,
+            fg=self.text_gray,
+            font=("Segoe UI", 9, "italic"),
+            anchor="w"
+        )
+        info_label.pack(fill="x", padx=25, pady=(0, 18))
+        
+        # Output format section
+        output_section = self.create_section(content_frame, "STEP 3: OUTPUT FORMAT", 0)
+        
+        # Toggle for the collapsible advanced options frame
+        self.advanced_toggle = tk.Label(
+            output_section,
+            text="⚙️ Advanced options ▸",
+            font=("Segoe UI", 10, "bold"),
+            bg=self.bg_black,
+            fg=self.hd_yellow,
+            cursor="hand2"
+        )
+        self.advanced_toggle.pack(side="right")
+        self.advanced_toggle.bind("<Button-1>", lambda e: self.toggle_advanced_options())
         
-        # Snowflake connection section
-        self.create_section(content_frame, "STEP 2: SNOWFLAKE CONNECTION", 20)
+        output_frame = tk.Frame(content_frame, bg=self.dark_gray, highlightbackground=self.medium_gray, highlightthickness=1)
+        output_frame.pack(fill="x", pady=(0, 5), padx=0)
+        self.output_frame = output_frame
         
-        sf_frame = tk.Frame(content_frame, bg=self.dark_gray, highlightbackground=self.medium_gray, highlightthickness=1)
-        sf_frame.pack(fill="x", pady=(0, 25), padx=0)
+        format_row = tk.Frame(output_frame, bg=self.dark_gray)
+        format_row.pack(fill="x", padx=25, pady=15)
         
-        # Email input only
-        self.sf_inputs = {}
+        format_label = tk.Label(
+            format_row,
+            text="💾 Save As:",
+            bg=self.dark_gray,
+            fg=self.hd_yellow,
+            font=("Segoe UI", 11, "bold"),
+            width=18,
+            anchor="w"
+        )
+        format_label.pack(side="left", padx=(0, 10))
         
-        field_frame = tk.Frame(sf_frame, bg=self.dark_gray)
-        field_frame.pack(fill="x", padx=25, pady=20)
+        format_combo = ttk.Combobox(
+            format_row,
+            textvariable=self.output_format,
+            values=list(OUTPUT_FORMATS),
+            state="readonly",
+            font=("Segoe UI", 11),
+            style="Yellow.TCombobox"
+        )
+        format_combo.pack(side="left", fill="x", expand=True, ipady=4)
+        format_combo.bind("<<ComboboxSelected>>", self.on_output_format_change)
         
-        label = tk.Label(
-            field_frame,
-            text="✉️ HD Supply Email:",
+        # Advanced options, hidden until toggled: fetch partitioning, result reuse,
+        # Excel splitting and the extra mismatch report
+        self.advanced_frame = tk.Frame(content_frame, bg=self.dark_gray, highlightbackground=self.medium_gray, highlightthickness=1)
+        self.advanced_visible = False
+        
+        # Partitioned fetch: number of concurrent queries and partition column
+        partition_frame = tk.Frame(self.advanced_frame, bg=self.dark_gray)
+        partition_frame.pack(fill="x", padx=25, pady=(15, 8))
+        
+        partition_label = tk.Label(
+            partition_frame,
+            text="🧩 Fetch Partitions:",
             bg=self.dark_gray,
             fg=self.hd_yellow,
             font=("Segoe UI", 11, "bold"),
             width=18,
             anchor="w"
         )
-        label.pack(side="left", padx=(0, 10))
+        partition_label.pack(side="left", padx=(0, 10))
         
-        entry = tk.Entry(
-            field_frame,
+        partition_spin = tk.Spinbox(
+            partition_frame,
+            from_=1,
+            to=MAX_FETCH_PARTITIONS,
+            textvariable=self.fetch_partitions,
+            width=5,
             bg=self.medium_gray,
             fg=self.hd_bright_yellow,
             font=("Segoe UI", 11),
+            buttonbackground=self.light_gray,
             insertbackground=self.hd_yellow,
             relief="solid",
-            bd=1,
-            highlightbackground=self.light_gray,
-            highlightcolor=self.hd_yellow,
-            highlightthickness=1
+            bd=1
         )
-        entry.pack(side="left", fill="x", expand=True, ipady=10, ipadx=12)
-        entry.insert(0, "your.email@hdsupply.com")
-        self.sf_inputs['email'] = entry
+        partition_spin.pack(side="left", ipady=4)
         
-        # Info label with icon
-        info_label = tk.Label(
-            sf_frame,
-            text="🔒 Authentication will open in your browser automatically",
+        partition_by_label = tk.Label(
+            partition_frame,
+            text="split by",
+            bg=self.dark_gray,
+            fg=self.text_gray,
+            font=("Segoe UI", 10, "italic")
+        )
+        partition_by_label.pack(side="left", padx=10)
+        
+        partition_by_combo = ttk.Combobox(
+            partition_frame,
+            textvariable=self.partition_by,
+            values=PARTITION_KEYS,
+            state="readonly",
+            width=8,
+            font=("Segoe UI", 11),
+            style="Yellow.TCombobox"
+        )
+        partition_by_combo.pack(side="left", ipady=4)
+        
+        # Reuse persisted results of the last query instead of re-scanning
+        reuse_check = tk.Checkbutton(
+            self.advanced_frame,
+            text=f"♻️ Reuse my last Snowflake query results (up to {RESULT_REUSE_HOURS} hours old)",
+            variable=self.reuse_results,
             bg=self.dark_gray,
             fg=self.text_gray,
+            selectcolor=self.medium_gray,
+            activebackground=self.dark_gray,
+            activeforeground=self.hd_yellow,
             font=("Segoe UI", 9, "italic"),
             anchor="w"
         )
-        info_label.pack(fill="x", padx=25, pady=(0, 18))
+        reuse_check.pack(fill="x", padx=25, pady=(0, 8))
+        
+        # How to split Excel reports that exceed a single worksheet
+        split_row = tk.Frame(self.advanced_frame, bg=self.dark_gray)
+        split_row.pack(fill="x", padx=25, pady=(0, 5))
+        
+        split_label = tk.Label(
+            split_row,
+            text="✂️ Split Excel By:",
+            bg=self.dark_gray,
+            fg=self.hd_yellow,
+            font=("Segoe UI", 11, "bold"),
+            width=18,
+            anchor="w"
+        )
+        split_label.pack(side="left", padx=(0, 10))
+        
+        split_combo = ttk.Combobox(
+            split_row,
+            textvariable=self.excel_split_by,
+            values=EXCEL_SPLIT_OPTIONS,
+            state="readonly",
+            font=("Segoe UI", 11),
+            style="Yellow.TCombobox"
+        )
+        split_combo.pack(side="left", fill="x", expand=True, ipady=4)
+        
+        # Optional branded mismatch report alongside flat-file output
+        self.mismatch_check = tk.Checkbutton(
+            self.advanced_frame,
+            text="Also create branded Excel report (mismatches only)",
+            variable=self.include_mismatch_report,
+            bg=self.dark_gray,
+            fg=self.text_gray,
+            selectcolor=self.medium_gray,
+            activebackground=self.dark_gray,
+            activeforeground=self.hd_yellow,
+            font=("Segoe UI", 9, "italic"),
+            anchor="w"
+        )
+        self.mismatch_check.pack(fill="x", padx=25, pady=(0, 12))
+        self.on_output_format_change()
+        
+        # Process and view-results buttons side by side
+        button_row = tk.Frame(content_frame, bg=self.bg_black)
+        button_row.pack(pady=12)
         
         # Process button with enhanced styling
         process_btn = ModernButton(
-            content_frame,
+            button_row,
             text="⚡ PROCESS DATA",
             command=self.process_data,
             bg_color=self.hd_yellow,
@@ -282,9 +2488,22 @@ class VelocityValidatorApp:
             width=280,
             height=60
         )
-        process_btn.pack(pady=25)
+        process_btn.pack(side="left", padx=(0, 20))
         self.process_btn = process_btn
         
+        # Browse the last run's results without opening the output file
+        view_btn = ModernButton(
+            button_row,
+            text="🔎 VIEW RESULTS",
+            command=self.view_results,
+            bg_color=self.medium_gray,
+            fg_color=self.hd_yellow,
+            hover_color=self.light_gray,
+            width=220,
+            height=60
+        )
+        view_btn.pack(side="left")
+        
         # Progress window will be created when processing starts
         self.progress_window = None
         self.progress_bar = None
@@ -341,22 +2560,114 @@ class VelocityValidatorApp:
             anchor="w"
         )
         section_label.pack(side="left")
+        return section_container
+        
+    def toggle_advanced_options(self):
+        """Show or hide the advanced options, growing the window to fit them"""
+        self.root.update_idletasks()
+        if self.advanced_visible:
+            delta = -(self.advanced_frame.winfo_height() + 10)
+            self.advanced_frame.pack_forget()
+            self.advanced_toggle.config(text="⚙️ Advanced options ▸")
+        else:
+            self.advanced_frame.pack(fill="x", pady=(5, 5), after=self.output_frame)
+            self.root.update_idletasks()
+            delta = self.advanced_frame.winfo_reqheight() + 10
+            self.advanced_toggle.config(text="⚙️ Advanced options ▾")
+        self.advanced_visible = not self.advanced_visible
+        
+        # Never grow past the screen; the window can also be resized vertically
+        height = max(WINDOW_HEIGHT, self.root.winfo_height() + delta)
+        height = min(height, self.root.winfo_screenheight() - WINDOW_SCREEN_MARGIN)
+        self.root.geometry(f"{WINDOW_WIDTH}x{height}")
+        
+    def on_output_format_change(self, event=None):
+        """Enable the mismatch report option only for flat-file output formats"""
+        format_key, _ = OUTPUT_FORMATS[self.output_format.get()]
+        if format_key in ("excel", "excel_mismatches"):
+            self.include_mismatch_report.set(False)
+            self.mismatch_check.config(state="disabled")
+        else:
+            self.mismatch_check.config(state="normal")
+        
+    def post_ui(self, callback):
+        """
+        Queue a GUI update from the worker thread.
+        
+        Tk widgets are not thread-safe, so the worker never touches them directly.
+        Queued callbacks are applied on the main thread by pump_ui_queue.
+        
+        Args:
+            callback: Function to run on the Tk main thread
+        """
+        self.ui_queue.put(callback)
+        
+    def pump_ui_queue(self):
+        """Apply all queued worker events on a fixed UI tick"""
+        try:
+            while True:
+                callback = self.ui_queue.get_nowait()
+                callback()
+        except queue.Empty:
+            pass
+        finally:
+            self.root.after(UI_POLL_MS, self.pump_ui_queue)
+            
+    def check_cancelled(self):
+        """Cancellation checkpoint: raise PipelineCancelled if the user cancelled"""
+        if self.cancel_event.is_set():
+            raise PipelineCancelled()
+            
+    def cancel_processing(self):
+        """Request cancellation of the running pipeline"""
+        if not self.worker_thread or not self.worker_thread.is_alive():
+            return
+        self.cancel_event.set()
+        if self.progress_label:
+            self.progress_label.config(text="Cancelling...")
+            
+    def view_results(self):
+        """Open (or raise) the results viewer for the last merged run"""
+        if self.results_view is None:
+            messagebox.showwarning("No Results", "Process a file first to view its results.")
+            return
+        # Let the viewer take input while the output is still being written
+        if self.progress_window:
+            self.progress_window.grab_release()
+        if self.results_window is not None and self.results_window.winfo_exists():
+            self.results_window.lift()
+            return
+        self.results_window = ResultsViewer(self, self.results_view)
+        
+    def publish_results(self, results_view):
+        """Make a run's merged data browsable before its output has been written"""
+        self.results_view = results_view
+        if self.progress_window:
+            self.progress_view_btn.pack(side="left", padx=(15, 0))
+            
+    def release_results(self):
+        """Close the results viewer and drop the previous run's data"""
+        if self.results_window is not None and self.results_window.winfo_exists():
+            self.results_window.destroy()
+        self.results_window = None
+        self.results_view = None
         
     def create_progress_window(self):
         """Create a detailed progress tracking window"""
         self.progress_window = tk.Toplevel(self.root)
         self.progress_window.title("Processing...")
-        self.progress_window.geometry("600x400")
+        self.progress_window.geometry("600x470")
         self.progress_window.resizable(False, False)
         self.progress_window.configure(bg=self.bg_black)
         self.progress_window.transient(self.root)
         self.progress_window.grab_set()
+        self.progress_window.protocol("WM_DELETE_WINDOW", self.cancel_processing)
         
         # Center the window
         self.progress_window.update_idletasks()
         x = (self.progress_window.winfo_screenwidth() // 2) - (600 // 2)
-        y = (self.progress_window.winfo_screenheight() // 2) - (400 // 2)
-        self.progress_window.geometry(f"600x400+{x}+{y}")
+        y = (self.progress_window.winfo_screenheight() // 2) - (470 // 2)
+        self.progress_window.geometry(f"600x470+{x}+{y}")
         
         # Header
         header = tk.Label(
@@ -385,7 +2696,7 @@ class VelocityValidatorApp:
             "5. Validating data structure...",
             "6. Merging datasets...",
             "7. Comparing velocities...",
-            "8. Generating Excel report...",
+            "8. Generating output report...",
             "9. Applying formatting...",
             "10. Saving output file..."
         ]
@@ -439,6 +2750,34 @@ class VelocityValidatorApp:
         self.progress_bar.pack(pady=(5, 10))
         self.progress_bar['value'] = 0
         
+        button_row = tk.Frame(self.progress_window, bg=self.bg_black)
+        button_row.pack(pady=(0, 15))
+        
+        # Cancel button stops the pipeline at the next checkpoint
+        cancel_btn = ModernButton(
+            button_row,
+            text="✖ CANCEL",
+            command=self.cancel_processing,
+            bg_color=self.medium_gray,
+            fg_color=self.hd_yellow,
+            hover_color=self.light_gray,
+            width=160,
+            height=40
+        )
+        cancel_btn.pack(side="left")
+        
+        # Shown by publish_results once the merged data can be browsed
+        self.progress_view_btn = ModernButton(
+            button_row,
+            text="🔎 VIEW RESULTS",
+            command=self.view_results,
+            bg_color=self.hd_yellow,
+            fg_color=self.bg_black,
+            hover_color=self.hd_bright_yellow,
+            width=180,
+            height=40
+        )
+        
     def update_progress_step(self, step_index, status="active"):
         """Update a specific step's status
         status: 'active', 'complete', 'error'
@@ -463,10 +2802,8 @@ class VelocityValidatorApp:
             progress_percent = ((step_index + 1) / len(self.step_labels)) * 100
             self.progress_bar['value'] = progress_percent
             
-            if self.progress_label:
+            if self.progress_label and not self.cancel_event.is_set():
                 self.progress_label.config(text=f"Progress: {int(progress_percent)}%")
-            
-        self.progress_window.update()
         
     def close_progress_window(self):
         """Close the progress window"""
@@ -499,7 +2836,7 @@ class VelocityValidatorApp:
             # Update UI with selected file (yellow text indicates selection)
             self.file_label.config(text=f"✓ {display_name}", fg=self.hd_yellow)
             
-    def connect_snowflake(self):
+    def connect_snowflake(self, settings):
         """
         Establish connection to Snowflake and fetch velocity data.
         
@@ -507,50 +2844,49 @@ class VelocityValidatorApp:
         Queries the SKUEXTRACT table for velocity codes and aliases columns
         to match the expected format in the input file.
         
+        Args:
+            settings: Run settings captured by read_run_settings
+            
         Returns:
             bool: True if connection and data fetch successful, False otherwise
         """
         try:
-            # Automated connection using externalbrowser authentication (opens browser for SSO)
-            con = snowflake.connector.connect(
-                user=self.sf_inputs['email'].get().strip(),  # HD Supply email from user input
-                account="HDSUPPLY-DATA",  # HD Supply Snowflake account
-                authenticator="externalbrowser",  # SSO authentication
-                insecure_mode=True  # Allow insecure connections
-            )
-            
-            cur = con.cursor()
-            
-            # Query Snowflake for velocity data
-            # Aliases ITEM -> JDA_ITEM and LOC -> JDA_LOC to match input file format
-            query = """
-            SELECT
-                ITEM as JDA_ITEM,
-                LOC as JDA_LOC,
-                UDC_VELOCITY_CODE
-            FROM
-                EDP.STD_JDA.SKUEXTRACT
-            """
-            
-            cur.execute(query)
-            
-            # Fetch results and convert to DataFrame
-            columns = [col[0] for col in cur.description]
-            results = cur.fetchall()
-            self.snowflake_data = pd.DataFrame(results, columns=columns)
-            
-            cur.close()
-            con.close()
+            email = settings['email']
+            con = connect_velocity_source(email)
+            try:
+                self.snowflake_data, self.fetch_source = fetch_velocity_data_reusing(
+                    con,
+                    email,
+                    self.query_cache,
+                    self.check_cancelled,
+                    partitions=settings['partitions'],
+                    partition_by=settings['partition_by'],
+                    timings=self.fetch_timings,
+                    allow_reuse=settings['reuse_results']
+                )
+            finally:
+                con.close()
             return True
             
+        except PipelineCancelled:
+            raise
+            
         except Exception as e:
             error_msg = str(e)
-            self.root.after(0, lambda: messagebox.showerror(
+            self.post_ui(lambda: messagebox.showerror(
                 "Connection Error", 
                 f"Failed to connect to Snowflake:\n\n{error_msg}"
             ))
             return False
             
+    def get_fetch_partitions(self):
+        """Return the partition count entered in the GUI, clamped to a valid range"""
+        try:
+            partitions = int(self.fetch_partitions.get())
+        except ValueError:
+            partitions = 1
+        return max(1, min(partitions, MAX_FETCH_PARTITIONS))
+        
     def validate_inputs(self):
         """
         Validate user inputs before processing.
@@ -581,329 +2917,784 @@ class VelocityValidatorApp:
                 
         return True
             
+    def read_run_settings(self):
+        """
+        Capture the GUI settings for a run on the Tk main thread.
+        
+        The worker thread only uses this snapshot and never reads Tk variables.
+        
+        Returns:
+            dict: file_path, email, partitions, partition_by, reuse_results,
+            format_label, include_mismatch_report, excel_split_by
+        """
+        return {
+            'file_path': self.input_file_path.get(),
+            'email': self.sf_inputs['email'].get().strip(),
+            'partitions': self.get_fetch_partitions(),
+            'partition_by': self.partition_by.get(),
+            'reuse_results': self.reuse_results.get(),
+            'format_label': self.output_format.get(),
+            'include_mismatch_report': self.include_mismatch_report.get(),
+            'excel_split_by': self.excel_split_by.get()
+        }
+        
     def process_data(self):
         """Start data processing in a separate thread"""
+        if self.worker_thread and self.worker_thread.is_alive():
+            messagebox.showwarning("Processing", "A validation is already running!")
+            return
+            
         if not self.validate_inputs():
             return
             
+        # The previous run's results are replaced by this run
+        self.release_results()
+        gc.collect()
+        
         # Run processing in a separate thread to keep UI responsive
-        thread = threading.Thread(target=self.process_data_thread, daemon=True)
-        thread.start()
+        settings = self.read_run_settings()
+        self.cancel_event.clear()
+        self.worker_thread = threading.Thread(
+            target=self.process_data_thread, args=(settings,), daemon=True
+        )
+        self.worker_thread.start()
+        
+    def process_data_thread(self, settings):
+        """
+        Process the data in a background thread.
         
-    def process_data_thread(self):
-        """Process the data in a background thread"""
+        GUI updates are queued through post_ui, and check_cancelled is called
+        between stages so a cancelled run stops and releases its data promptly.
+        Expensive stages are checkpointed under a run ID, so retrying a failed
+        run resumes from the last completed stage: the fetch is reused for the same
+        user and fetch settings, load and merge for the same input file.
+        
+        Args:
+            settings: Run settings captured on the main thread (see read_run_settings)
+        """
+        df_merged = None
+        results_view = None
+        run_id = None
+        fetch_run_id = None
+        memory_before = process_memory_mb()
         try:
             # Create progress window
-            self.root.after(0, self.create_progress_window)
-            import time
+            self.post_ui(self.create_progress_window)
             time.sleep(0.3)  # Brief pause to show window
             
-            # Step 0: Connecting to Snowflake
-            self.root.after(0, lambda: self.update_progress_step(0, "active"))
-            time.sleep(0.2)
-            
-            # Step 1: Authenticating
-            self.root.after(0, lambda: self.update_progress_step(0, "complete"))
-            self.root.after(0, lambda: self.update_progress_step(1, "active"))
-            
-            if not self.connect_snowflake():
-                self.root.after(0, lambda: self.update_progress_step(1, "error"))
-                time.sleep(1)
-                self.root.after(0, self.close_progress_window)
-                return
-            
-            # Step 2: Fetching velocity data (completed in connect_snowflake)
-            self.root.after(0, lambda: self.update_progress_step(1, "complete"))
-            self.root.after(0, lambda: self.update_progress_step(2, "active"))
-            time.sleep(0.3)
-            self.root.after(0, lambda: self.update_progress_step(2, "complete"))
-            
-            # Step 3: Loading input file
-            self.root.after(0, lambda: self.update_progress_step(3, "active"))
-            file_path = self.input_file_path.get()
-            if file_path.endswith('.csv'):
-                df = pd.read_csv(file_path)
-            else:
-                df = pd.read_excel(file_path)
-            self.root.after(0, lambda: self.update_progress_step(3, "complete"))
-            
-            # Step 4: Validating data structure
-            self.root.after(0, lambda: self.update_progress_step(4, "active"))
-            time.sleep(0.2)
-            
-            # Validate columns
-            if 'JDA_ITEM' not in df.columns or 'JDA_LOC' not in df.columns:
-                self.root.after(0, lambda: self.update_progress_step(4, "error"))
-                time.sleep(0.5)
-                self.root.after(0, self.close_progress_window)
-                self.root.after(0, lambda: messagebox.showerror(
-                    "Column Error",
-                    "Required columns JDA_ITEM and/or JDA_LOC not found in input file!"
-                ))
-                return
-            
-            self.root.after(0, lambda: self.update_progress_step(4, "complete"))
-            
-            # Step 5: Merging datasets
-            self.root.after(0, lambda: self.update_progress_step(5, "active"))
-            
-            # Convert merge columns to string type to ensure compatibility
-            df['JDA_ITEM'] = df['JDA_ITEM'].astype(str)
-            df['JDA_LOC'] = df['JDA_LOC'].astype(str)
-            self.snowflake_data['JDA_ITEM'] = self.snowflake_data['JDA_ITEM'].astype(str)
-            self.snowflake_data['JDA_LOC'] = self.snowflake_data['JDA_LOC'].astype(str)
-            
-            df_merged = df.merge(
-                self.snowflake_data,
-                on=['JDA_ITEM', 'JDA_LOC'],
-                how='left'
+            file_path = settings['file_path']
+            self.checkpoints.cleanup_expired()
+            run_id = self.checkpoints.run_id_for(file_path, settings['email'])
+            fetch_run_id = self.checkpoints.fetch_run_id_for(
+                settings['email'], settings['partitions'], settings['partition_by'], settings['reuse_results']
             )
             
-            # Add DCSKU column (concatenate DC + USN)
-            if 'DC' in df_merged.columns and 'USN' in df_merged.columns:
-                df_merged['DCSKU'] = df_merged['DC'].astype(str) + df_merged['USN'].astype(str)
-            
-            time.sleep(0.3)
-            self.root.after(0, lambda: self.update_progress_step(5, "complete"))
-            
-            # Step 6: Comparing velocities
-            self.root.after(0, lambda: self.update_progress_step(6, "active"))
-            
-            # Rename UDC_VELOCITY_CODE to Current_Velocity if it exists
-            if 'UDC_VELOCITY_CODE' in df_merged.columns:
-                df_merged.rename(columns={'UDC_VELOCITY_CODE': 'Current_Velocity'}, inplace=True)
-            else:
-                # Column not found, create empty Current_Velocity column
-                df_merged['Current_Velocity'] = None
-            
-            if 'PROPOSED_VELOCITY' in df_merged.columns and 'Current_Velocity' in df_merged.columns:
-                df_merged['Match'] = df_merged.apply(
-                    lambda row: row['Current_Velocity'] == row['PROPOSED_VELOCITY'] 
-                    if pd.notna(row['Current_Velocity']) and pd.notna(row['PROPOSED_VELOCITY'])
-                    else False,
-                    axis=1
-                )
+            # Resume from the merge checkpoint if a previous attempt got that far
+            df_merged = self.checkpoints.load(run_id, "merge")
+            if df_merged is not None:
+                self.fetch_timings = []
+                self.fetch_source = "Saved checkpoint from a previous attempt"
+                for step_index in range(7):
+                    self.post_ui(lambda i=step_index: self.update_progress_step(i, "complete"))
             else:
-                if 'PROPOSED_VELOCITY' not in df_merged.columns:
-                    self.root.after(0, lambda: messagebox.showwarning(
-                        "Warning",
-                        "PROPOSED_VELOCITY column not found in input file.\nMatch column will be set to False."
-                    ))
-                df_merged['Match'] = False
+                df_merged = self.build_merged_data(run_id, fetch_run_id, settings)
+                if df_merged is None:
+                    return
+                self.checkpoints.save(run_id, "merge", df_merged)
             
-            time.sleep(0.2)
-            self.root.after(0, lambda: self.update_progress_step(6, "complete"))
+            # Results can be browsed while the output is written; filter masks are built here,
+            # off the GUI thread
+            results_view = ResultsView(df_merged)
+            self.post_ui(lambda: self.publish_results(results_view))
             
-            # Step 7: Generating Excel report
-            self.root.after(0, lambda: self.update_progress_step(7, "active"))
+            self.check_cancelled()
             
-            # Generate output filename
+            # Step 7: Generating output report
+            self.post_ui(lambda: self.update_progress_step(7, "active"))
+            
+            # Generate output filename based on the selected format
+            format_key, extension = OUTPUT_FORMATS[settings['format_label']]
             input_dir = os.path.dirname(file_path)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_filename = f"Velocity_Validated_{timestamp}.xlsx"
+            output_filename = f"Velocity_Validated_{timestamp}{extension}"
             output_path = os.path.join(input_dir, output_filename)
             
             time.sleep(0.2)
-            self.root.after(0, lambda: self.update_progress_step(7, "complete"))
+            self.post_ui(lambda: self.update_progress_step(7, "complete"))
             
             # Step 8: Applying formatting
-            self.root.after(0, lambda: self.update_progress_step(8, "active"))
+            self.post_ui(lambda: self.update_progress_step(8, "active"))
             time.sleep(0.3)
             
             # Step 9: Saving output file
-            self.root.after(0, lambda: self.update_progress_step(8, "complete"))
-            self.root.after(0, lambda: self.update_progress_step(9, "active"))
+            self.post_ui(lambda: self.update_progress_step(8, "complete"))
+            self.post_ui(lambda: self.update_progress_step(9, "active"))
+            
+            # Save in the selected format
+            self.check_cancelled()
+            writer = OutputWriter(
+                include_mismatch_report=settings['include_mismatch_report'],
+                excel_split_by=settings['excel_split_by'],
+                check_cancelled=self.check_cancelled
+            )
+            output_files = writer.save_output(df_merged, output_path, format_key)
+            self.check_cancelled()
             
-            # Save to Excel with formatting
-            self.save_formatted_excel(df_merged, output_path)
+            # Run finished, checkpoints are no longer needed
+            self.checkpoints.clear(run_id)
+            self.checkpoints.clear(fetch_run_id)
             
             time.sleep(0.3)
-            self.root.after(0, lambda: self.update_progress_step(9, "complete"))
+            self.post_ui(lambda: self.update_progress_step(9, "complete"))
             
             # Calculate statistics
             total_rows = len(df_merged)
-            matches = df_merged['Match'].sum() if 'Match' in df_merged.columns else 0
+            matches = int(df_merged['Match'].sum()) if 'Match' in df_merged.columns else 0
             mismatches = total_rows - matches
+            output_list = "\n".join(f"• {os.path.basename(path)}" for path in output_files)
+            fetch_report = f"Velocity Data Source:\n• {self.fetch_source}\n\n" if self.fetch_source else ""
+            if len(self.fetch_timings) > 1:
+                fetch_report += f"Snowflake Fetch:\n{format_fetch_timings(self.fetch_timings)}\n\n"
+            memory_report = format_memory_report(memory_before, process_memory_mb())
+            if memory_report:
+                memory_report = f"Memory:\n{memory_report}\n\n"
             
             # Close progress window
             time.sleep(0.5)
-            self.root.after(0, self.close_progress_window)
+            self.post_ui(self.close_progress_window)
             
-            self.root.after(0, lambda: messagebox.showinfo(
+            self.post_ui(lambda: messagebox.showinfo(
                 "Processing Complete",
                 f"✓ Velocity validation completed successfully!\n\n"
-                f"Output: {output_filename}\n\n"
+                f"Output:\n{output_list}\n\n"
                 f"Statistics:\n"
                 f"• Total Records: {total_rows:,}\n"
                 f"• Matches: {matches:,}\n"
                 f"• Mismatches: {mismatches:,}\n\n"
+                f"{fetch_report}"
+                f"{memory_report}"
                 f"Columns Added:\n"
                 f"• Current_Velocity (from Snowflake)\n"
-                f"• Match (True/False comparison)"
+                f"• Match (True/False comparison)\n"
+                f"• In_Snowflake (key found in SKUEXTRACT)\n\n"
+                f"Click 🔎 VIEW RESULTS to browse and filter the results."
+            ))
+            
+        except PipelineCancelled:
+            # Release the fetched and merged data right away
+            df_merged = None
+            results_view = None
+            self.snowflake_data = None
+            self.post_ui(self.release_results)
+            for checkpoint_id in (run_id, fetch_run_id):
+                if checkpoint_id:
+                    self.checkpoints.clear(checkpoint_id)
+            gc.collect()
+            self.post_ui(self.close_progress_window)
+            self.post_ui(lambda: messagebox.showinfo(
+                "Processing Cancelled",
+                "Velocity validation was cancelled."
             ))
             
         except Exception as e:
-            import time
+            # Release the fetched data; completed stages are checkpointed for a retry
+            self.snowflake_data = None
+            gc.collect()
             error_message = str(e)
+            if any(checkpoint_id and self.checkpoints.has_any(checkpoint_id)
+                   for checkpoint_id in (run_id, fetch_run_id)):
+                error_message += (
+                    "\n\nCompleted stages were saved. "
+                    "Click PROCESS DATA again with the same file to resume."
+                )
+            if results_view is not None:
+                error_message += "\n\nThe validated data can still be browsed with VIEW RESULTS."
             time.sleep(0.5)
-            self.root.after(0, self.close_progress_window)
-            self.root.after(0, lambda msg=error_message: messagebox.showerror(
+            self.post_ui(self.close_progress_window)
+            self.post_ui(lambda msg=error_message: messagebox.showerror(
                 "Processing Error",
                 f"An error occurred during processing:\n\n{msg}"
             ))
             
-    def save_formatted_excel(self, df, output_path):
-        """Save DataFrame to Excel with HD Supply formatting and Summary sheet"""
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            # Write main data sheet
-            df.to_excel(writer, sheet_name='Velocity Validation', index=False)
-            
-            # Create Summary sheet with statistics
-            total_records = len(df)
-            matches = df['Match'].sum() if 'Match' in df.columns else 0
-            mismatches = total_records - matches
-            
-            summary_data = {
-                'Statistics': ['Total Records', 'Matches', 'Mismatches'],
-                'Count': [total_records, int(matches), int(mismatches)]
-            }
-            summary_df = pd.DataFrame(summary_data)
-            summary_df.to_excel(writer, sheet_name='Summary', index=False)
-            
-            # Get the workbook and worksheets
-            workbook = writer.book
-            worksheet = writer.sheets['Velocity Validation']
-            summary_sheet = writer.sheets['Summary']
-            
-            # Apply formatting
-            from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
-            
-            # HD Supply color scheme
-            header_fill = PatternFill(start_color="000000", end_color="000000", fill_type="solid")
-            header_font = Font(color="FFD700", bold=True, size=11)
-            
-            yellow_fill = PatternFill(start_color="FFFACD", end_color="FFFACD", fill_type="solid")
-            red_fill = PatternFill(start_color="FFE6E6", end_color="FFE6E6", fill_type="solid")
-            green_fill = PatternFill(start_color="E6FFE6", end_color="E6FFE6", fill_type="solid")
-            
-            thin_border = Border(
-                left=Side(style='thin', color='CCCCCC'),
-                right=Side(style='thin', color='CCCCCC'),
-                top=Side(style='thin', color='CCCCCC'),
-                bottom=Side(style='thin', color='CCCCCC')
-            )
+    def build_merged_data(self, run_id, fetch_run_id, settings):
+        """
+        Fetch, load, merge and compare the data (progress steps 1-7).
+        
+        The fetch and load stages reuse their checkpoints when present and
+        save new ones after completing.
+        
+        Args:
+            run_id: Checkpoint run ID for this input file (load stage)
+            fetch_run_id: Checkpoint run ID for the fetch settings (fetch stage)
+            settings: Run settings captured by read_run_settings
             
-            # Format headers
-            for cell in worksheet[1]:
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-                cell.border = thin_border
+        Returns:
+            DataFrame or None: Merged data with Current_Velocity and Match columns,
+            or None if the run stopped on an error already reported to the user
+        """
+        # Step 0: Connecting to Snowflake
+        self.post_ui(lambda: self.update_progress_step(0, "active"))
+        time.sleep(0.2)
+        
+        # Step 1: Authenticating
+        self.post_ui(lambda: self.update_progress_step(0, "complete"))
+        self.post_ui(lambda: self.update_progress_step(1, "active"))
+        
+        self.fetch_timings = []
+        self.snowflake_data = self.checkpoints.load(fetch_run_id, "fetch")
+        if self.snowflake_data is None:
+            if not self.connect_snowflake(settings):
+                self.post_ui(lambda: self.update_progress_step(1, "error"))
+                time.sleep(1)
+                self.post_ui(self.close_progress_window)
+                return None
+            self.check_cancelled()
+            self.checkpoints.save(fetch_run_id, "fetch", self.snowflake_data)
+        else:
+            self.fetch_source = "Saved checkpoint from a previous attempt"
+        
+        self.check_cancelled()
+        
+        # Step 2: Fetching velocity data (completed in connect_snowflake)
+        self.post_ui(lambda: self.update_progress_step(1, "complete"))
+        self.post_ui(lambda: self.update_progress_step(2, "active"))
+        time.sleep(0.3)
+        self.post_ui(lambda: self.update_progress_step(2, "complete"))
+        
+        # Step 3: Loading input file
+        self.post_ui(lambda: self.update_progress_step(3, "active"))
+        df = self.checkpoints.load(run_id, "load")
+        if df is None:
+            df = load_input_file(settings['file_path'], self.check_cancelled)
+            self.check_cancelled()
+            self.checkpoints.save(run_id, "load", df)
+        self.check_cancelled()
+        self.post_ui(lambda: self.update_progress_step(3, "complete"))
+        
+        # Step 4: Validating data structure
+        self.post_ui(lambda: self.update_progress_step(4, "active"))
+        time.sleep(0.2)
+        
+        # Validate columns
+        if 'JDA_ITEM' not in df.columns or 'JDA_LOC' not in df.columns:
+            # The run stops here; do not keep the velocity data resident until the next run
+            del df
+            self.snowflake_data = None
+            gc.collect()
+            self.post_ui(lambda: self.update_progress_step(4, "error"))
+            time.sleep(0.5)
+            self.post_ui(self.close_progress_window)
+            self.post_ui(lambda: messagebox.showerror(
+                "Column Error",
+                "Required columns JDA_ITEM and/or JDA_LOC not found in input file!"
+            ))
+            return None
+        
+        self.post_ui(lambda: self.update_progress_step(4, "complete"))
+        
+        # Step 5: Merging datasets
+        self.check_cancelled()
+        self.post_ui(lambda: self.update_progress_step(5, "active"))
+        
+        normalize_velocity_keys(self.snowflake_data)
+        df_merged = merge_velocity_data(df, self.snowflake_data)
+        
+        # Release the source frames; both are checkpointed if a retry needs them
+        del df
+        self.snowflake_data = None
+        gc.collect()
+        
+        self.check_cancelled()
+        time.sleep(0.3)
+        self.post_ui(lambda: self.update_progress_step(5, "complete"))
+        
+        # Step 6: Comparing velocities
+        self.post_ui(lambda: self.update_progress_step(6, "active"))
+        
+        if 'PROPOSED_VELOCITY' not in df_merged.columns:
+            self.post_ui(lambda: messagebox.showwarning(
+                "Warning",
+                "PROPOSED_VELOCITY column not found in input file.\nMatch column will be set to False."
+            ))
+        df_merged = compare_velocities(df_merged)
+        
+        self.check_cancelled()
+        time.sleep(0.2)
+        self.post_ui(lambda: self.update_progress_step(6, "complete"))
+        return df_merged
                 
-            # Highlight Match column
-            if 'Match' in df.columns:
-                match_col_idx = df.columns.get_loc('Match') + 1
-                for row_idx in range(2, len(df) + 2):
-                    cell = worksheet.cell(row=row_idx, column=match_col_idx)
-                    cell_value = cell.value
-                    
-                    if cell_value == False or cell_value == 'False':
-                        cell.fill = red_fill
-                        cell.font = Font(color="CC0000", bold=True)
-                    elif cell_value == True or cell_value == 'True':
-                        cell.fill = green_fill
-                        cell.font = Font(color="006600", bold=True)
-                        
-                    cell.alignment = Alignment(horizontal="center", vertical="center")
-                    cell.border = thin_border
-                    
-            # Highlight Current_Velocity column
-            if 'Current_Velocity' in df.columns:
-                vel_col_idx = df.columns.get_loc('Current_Velocity') + 1
-                for row_idx in range(2, len(df) + 2):
-                    cell = worksheet.cell(row=row_idx, column=vel_col_idx)
-                    cell.fill = yellow_fill
-                    cell.alignment = Alignment(horizontal="center", vertical="center")
-                    cell.border = thin_border
-                    
-            # Auto-adjust column widths
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if cell.value:
-                            max_length = max(max_length, len(str(cell.value)))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 3, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-            
-            # Format Summary sheet
-            from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
-            
-            # HD Supply branded header
-            header_fill = PatternFill(start_color="000000", end_color="000000", fill_type="solid")
-            header_font = Font(color="FFD700", bold=True, size=12)
-            
-            data_font = Font(size=11, bold=True)
-            number_fill = PatternFill(start_color="FFFACD", end_color="FFFACD", fill_type="solid")
-            
-            thin_border = Border(
-                left=Side(style='thin', color='CCCCCC'),
-                right=Side(style='thin', color='CCCCCC'),
-                top=Side(style='thin', color='CCCCCC'),
-                bottom=Side(style='thin', color='CCCCCC')
+
+
+class ValidationService:
+    """
+    Long-running validation service (daemon mode) without the GUI.
+    
+    Authenticates to Snowflake once, keeps the velocity data resident in memory
+    and refreshes it on a schedule, so each job only pays for load, merge and
+    write. Jobs are accepted from a watched drop folder and a local HTTP API and
+    run concurrently on a worker pool.
+    
+    Drop folder layout (created automatically):
+        <watch_dir>/             New input files are picked up from here
+        <watch_dir>/processing/  Files currently being validated, renamed <name>_<job id>
+        <watch_dir>/output/      Validation results
+        <watch_dir>/processed/   Input files that were validated successfully
+        <watch_dir>/failed/      Input files that failed, with a .error.txt note
+        
+    HTTP API (bound to localhost):
+        GET  /status    Velocity data size, last refresh time and job counts
+        POST /validate  application/json body {"path": ..., "format": ..., "output_dir": ...};
+                        returns the output paths and match statistics
+    
+    Args:
+        email: HD Supply email address used for Snowflake SSO
+        watch_dir: Drop folder to watch, or None to disable folder watching
+        host: HTTP bind address
+        port: HTTP port, or None to disable the HTTP API
+        workers: Number of concurrent validation jobs
+        refresh_minutes: Minutes between velocity data refreshes
+        format_key: Default output format (see OUTPUT_FORMATS)
+        include_mismatch_report: Also write a mismatches-only Excel report
+        excel_split_by: How oversized Excel reports are sharded
+        partitions: Concurrent partition queries per velocity refresh
+        partition_by: SKUEXTRACT column used to partition the fetch
+    """
+    def __init__(self, email, watch_dir=None, host=SERVICE_HOST, port=SERVICE_PORT,
+                 workers=SERVICE_WORKERS, refresh_minutes=SERVICE_REFRESH_MINUTES,
+                 format_key="parquet", include_mismatch_report=False,
+                 excel_split_by=EXCEL_SPLIT_OPTIONS[0], partitions=1,
+                 partition_by=PARTITION_KEYS[0]):
+        self.email = email
+        self.watch_dir = watch_dir
+        self.host = host
+        self.port = port
+        self.refresh_minutes = refresh_minutes
+        self.format_key = format_key
+        self.include_mismatch_report = include_mismatch_report
+        self.excel_split_by = excel_split_by
+        self.partitions = partitions
+        self.partition_by = partition_by
+        
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.stop_event = threading.Event()
+        self.connection = None
+        self.velocity_data = None
+        self.last_refresh = None
+        self.fetch_timings = []
+        self.fetch_source = None
+        self.query_cache = QueryResultCache()
+        self.velocity_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.job_stats = {'running': 0, 'completed': 0, 'failed': 0}
+        self.http_server = None
+        
+    def refresh_velocity_data(self, allow_reuse=False):
+        """
+        Re-query the velocity data and swap it in for new jobs.
+        
+        Reuses the open Snowflake session; reconnects once if it has expired.
+        Running jobs keep the snapshot they started with.
+        
+        Args:
+            allow_reuse: Reuse the last query's persisted results if recent
+                (used at startup; scheduled refreshes always re-query)
+        """
+        started = time.time()
+        timings = []
+        try:
+            if self.connection is None or self.connection.is_closed():
+                self.connection = connect_velocity_source(self.email)
+            velocity_data, source = fetch_velocity_data_reusing(
+                self.connection, self.email, self.query_cache, partitions=self.partitions,
+                partition_by=self.partition_by, timings=timings, allow_reuse=allow_reuse
+            )
+        except Exception:
+            logger.warning("Velocity refresh failed, reconnecting to Snowflake")
+            if self.connection is not None:
+                self.connection.close()
+            self.connection = connect_velocity_source(self.email)
+            timings = []
+            velocity_data, source = fetch_velocity_data_reusing(
+                self.connection, self.email, self.query_cache, partitions=self.partitions,
+                partition_by=self.partition_by, timings=timings, allow_reuse=allow_reuse
             )
             
-            # Format summary headers
-            for cell in summary_sheet[1]:
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-                cell.border = thin_border
+        normalize_velocity_keys(velocity_data)
+        with self.velocity_lock:
+            self.velocity_data = velocity_data
+            self.last_refresh = datetime.now()
+            self.fetch_timings = timings
+            self.fetch_source = source
+        logger.info(
+            "Velocity data refreshed: %s rows in %.1fs (%s)",
+            f"{len(velocity_data):,}", time.time() - started, source
+        )
+        for timing in timings:
+            logger.info(
+                "  Partition %d: %s rows, query %.1fs, download %.1fs", timing['partition'],
+                f"{timing['rows']:,}", timing['query_seconds'], timing['fetch_seconds']
+            )
+        
+    def refresh_loop(self):
+        """Refresh the velocity data every refresh_minutes until stopped"""
+        while not self.stop_event.wait(self.refresh_minutes * 60):
+            try:
+                self.refresh_velocity_data()
+            except Exception:
+                logger.exception("Scheduled velocity refresh failed; keeping previous data")
+                
+    def validate_file(self, file_path, output_dir=None, format_key=None):
+        """
+        Validate one input file against the resident velocity data.
+        
+        Args:
+            file_path: Input Excel/CSV file with JDA_ITEM and JDA_LOC columns
+            output_dir: Directory for the results (defaults to the input directory)
+            format_key: Output format (defaults to the service format)
             
-            # Format summary data rows
-            for row_idx in range(2, 5):  # Rows 2-4 (Total, Matches, Mismatches)
-                for col_idx in range(1, 3):  # Columns A-B
-                    cell = summary_sheet.cell(row=row_idx, column=col_idx)
-                    cell.font = data_font
-                    cell.border = thin_border
-                    cell.alignment = Alignment(horizontal="center", vertical="center")
-                    
-                    if col_idx == 2:  # Count column
-                        cell.fill = number_fill
-                        cell.number_format = '#,##0'
-            
-            # Set column widths for summary
-            summary_sheet.column_dimensions['A'].width = 20
-            summary_sheet.column_dimensions['B'].width = 15
-            
-            # Add title row
-            summary_sheet.insert_rows(1)
-            summary_sheet['A1'] = 'VELOCITY VALIDATION SUMMARY'
-            summary_sheet.merge_cells('A1:B1')
-            title_cell = summary_sheet['A1']
-            title_cell.font = Font(color="FFD700", bold=True, size=14)
-            title_cell.fill = PatternFill(start_color="000000", end_color="000000", fill_type="solid")
-            title_cell.alignment = Alignment(horizontal="center", vertical="center")
+        Returns:
+            dict: Input path, output paths, record/match counts and elapsed seconds
+        """
+        started = time.time()
+        format_key = format_key or self.format_key
+        if format_key not in FORMAT_EXTENSIONS:
+            raise ValueError(f"Unsupported output format: {format_key}")
+            
+        with self.velocity_lock:
+            velocity_data = self.velocity_data
+        if velocity_data is None:
+            raise RuntimeError("Velocity data has not been loaded yet")
+            
+        df = load_input_file(file_path)
+        if 'JDA_ITEM' not in df.columns or 'JDA_LOC' not in df.columns:
+            raise ValueError("Required columns JDA_ITEM and/or JDA_LOC not found in input file!")
+        df_merged = compare_velocities(merge_velocity_data(df, velocity_data))
+        del df
+        
+        # Name outputs after the input file; the random suffix keeps jobs for the
+        # same file within the same second from overwriting each other
+        output_dir = output_dir or os.path.dirname(os.path.abspath(file_path))
+        os.makedirs(output_dir, exist_ok=True)
+        input_name = sanitize_filename_part(os.path.splitext(os.path.basename(file_path))[0])
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        job_suffix = uuid.uuid4().hex[:8]
+        output_path = os.path.join(
+            output_dir,
+            f"Velocity_Validated_{input_name}_{timestamp}_{job_suffix}{FORMAT_EXTENSIONS[format_key]}"
+        )
+        
+        writer = OutputWriter(
+            include_mismatch_report=self.include_mismatch_report,
+            excel_split_by=self.excel_split_by
+        )
+        output_files = writer.save_output(df_merged, output_path, format_key)
+        
+        total_rows = len(df_merged)
+        matches = int(df_merged['Match'].sum())
+        return {
+            'input': file_path,
+            'outputs': output_files,
+            'total_records': total_rows,
+            'matches': matches,
+            'mismatches': total_rows - matches,
+            'seconds': round(time.time() - started, 3)
+        }
+        
+    def run_job(self, file_path, output_dir=None, format_key=None):
+        """Run validate_file on the calling thread while tracking job counts"""
+        with self.stats_lock:
+            self.job_stats['running'] += 1
+        try:
+            result = self.validate_file(file_path, output_dir, format_key)
+            with self.stats_lock:
+                self.job_stats['completed'] += 1
+            logger.info("Validated %s in %.1fs", file_path, result['seconds'])
+            return result
+        except Exception:
+            with self.stats_lock:
+                self.job_stats['failed'] += 1
+            logger.exception("Validation failed for %s", file_path)
+            raise
+        finally:
+            with self.stats_lock:
+                self.job_stats['running'] -= 1
+                
+    def submit(self, file_path, output_dir=None, format_key=None):
+        """
+        Queue a validation job on the worker pool.
+        
+        Returns:
+            Future: Resolves to the validate_file result dict
+        """
+        return self.executor.submit(self.run_job, file_path, output_dir, format_key)
+        
+    def status(self):
+        """Return service status for the HTTP /status endpoint"""
+        with self.velocity_lock:
+            velocity_rows = None if self.velocity_data is None else len(self.velocity_data)
+            last_refresh = self.last_refresh.isoformat() if self.last_refresh else None
+            fetch_timings = list(self.fetch_timings)
+            fetch_source = self.fetch_source
+        with self.stats_lock:
+            jobs = dict(self.job_stats)
+        # Peak is over the service's lifetime
+        current_memory, peak_memory = process_memory_mb()
+        return {
+            'velocity_rows': velocity_rows,
+            'last_refresh': last_refresh,
+            'refresh_minutes': self.refresh_minutes,
+            'fetch_source': fetch_source,
+            'memory_mb': current_memory,
+            'peak_memory_mb': peak_memory,
+            'fetch_timings': fetch_timings,
+            'watch_dir': self.watch_dir,
+            'jobs': jobs
+        }
+        
+    def watch_loop(self):
+        """
+        Poll the drop folder and submit new input files.
+        
+        A file is picked up once its size is unchanged between two polls, so
+        files that are still being copied are not read half-written. Claimed
+        files get a unique job suffix, so a file dropped again under the same
+        name while the first copy is still running does not replace it.
+        """
+        folders = {name: os.path.join(self.watch_dir, name)
+                   for name in ('processing', 'output', 'processed', 'failed')}
+        for folder in folders.values():
+            os.makedirs(folder, exist_ok=True)
+            
+        pending_sizes = {}
+        while not self.stop_event.wait(SERVICE_POLL_SECONDS):
+            try:
+                names = os.listdir(self.watch_dir)
+            except OSError:
+                logger.exception("Cannot list drop folder %s", self.watch_dir)
+                continue
                 
+            current_sizes = {}
+            for name in names:
+                path = os.path.join(self.watch_dir, name)
+                # Skip folders, Excel lock files and unsupported types
+                if (not os.path.isfile(path) or name.startswith("~$")
+                        or not name.lower().endswith(INPUT_EXTENSIONS)):
+                    continue
+                size = os.path.getsize(path)
+                current_sizes[name] = size
+                if pending_sizes.get(name) != size:
+                    continue
+                    
+                # Claim the file so it is not picked up again
+                stem, extension = os.path.splitext(name)
+                processing_path = os.path.join(
+                    folders['processing'], f"{stem}_{uuid.uuid4().hex[:8]}{extension}"
+                )
+                try:
+                    os.replace(path, processing_path)
+                except OSError:
+                    continue
+                current_sizes.pop(name)
+                future = self.submit(processing_path, folders['output'])
+                future.add_done_callback(
+                    lambda f, p=processing_path: self.finish_dropped_file(f, p, folders)
+                )
+            pending_sizes = current_sizes
+            
+    def finish_dropped_file(self, future, processing_path, folders):
+        """Move a dropped input file to processed/ or failed/ when its job finishes"""
+        name = os.path.basename(processing_path)
+        error = future.exception()
+        target_dir = folders['failed'] if error else folders['processed']
+        try:
+            os.replace(processing_path, os.path.join(target_dir, name))
+            if error:
+                with open(os.path.join(target_dir, f"{name}.error.txt"), "w", encoding="utf-8") as handle:
+                    handle.write(f"{type(error).__name__}: {error}\n")
+        except OSError:
+            logger.exception("Could not move %s after validation", processing_path)
+            
+    def serve_forever(self):
+        """
+        Authenticate, load the velocity data and serve jobs until interrupted.
+        
+        Runs the HTTP API on the calling thread (or waits if it is disabled);
+        the refresh and drop folder loops run on background threads.
+        """
+        self.refresh_velocity_data(allow_reuse=True)
+        
+        threading.Thread(target=self.refresh_loop, daemon=True).start()
+        if self.watch_dir:
+            os.makedirs(self.watch_dir, exist_ok=True)
+            threading.Thread(target=self.watch_loop, daemon=True).start()
+            logger.info("Watching drop folder %s", self.watch_dir)
+            
+        try:
+            if self.port:
+                self.http_server = ThreadingHTTPServer((self.host, self.port), ValidationRequestHandler)
+                self.http_server.service = self
+                logger.info("HTTP API listening on http://%s:%s", self.host, self.port)
+                self.http_server.serve_forever()
+            else:
+                while not self.stop_event.wait(1):
+                    pass
+        except KeyboardInterrupt:
+            logger.info("Stopping validation service")
+        finally:
+            self.stop()
+            
+    def stop(self):
+        """Stop background loops, wait for running jobs and close the session"""
+        self.stop_event.set()
+        if self.http_server is not None:
+            self.http_server.server_close()
+        self.executor.shutdown(wait=True)
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class ValidationRequestHandler(BaseHTTPRequestHandler):
+    """HTTP API for ValidationService; the server carries the service instance"""
+    
+    def send_json(self, status_code, payload):
+        """Send a JSON response"""
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        
+    def do_GET(self):
+        """GET /status"""
+        if self.path.rstrip("/") != "/status":
+            self.send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+            return
+        self.send_json(200, self.server.service.status())
+        
+    def do_POST(self):
+        """POST /validate with a JSON body naming the input file"""
+        if self.path.rstrip("/") != "/validate":
+            self.send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+            return
+            
+        # Browsers can only send cross-site form posts as text/plain or form data,
+        # so requiring JSON keeps web pages from submitting jobs
+        if self.headers.get_content_type() != "application/json":
+            self.send_json(415, {'error': 'Content-Type must be application/json'})
+            return
+            
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            request = None
+        if not isinstance(request, dict) or not isinstance(request.get('path'), str):
+            self.send_json(400, {'error': 'Expected a JSON object with a "path" string'})
+            return
+            
+        file_path = request['path']
+        output_dir = request.get('output_dir')
+        format_key = request.get('format')
+        if output_dir is not None and not isinstance(output_dir, str):
+            self.send_json(400, {'error': '"output_dir" must be a string'})
+            return
+        if format_key is not None and (not isinstance(format_key, str) or format_key not in FORMAT_EXTENSIONS):
+            self.send_json(400, {
+                'error': f"Unsupported output format: {format_key}",
+                'formats': sorted(FORMAT_EXTENSIONS)
+            })
+            return
+        if not os.path.isfile(file_path):
+            self.send_json(400, {'error': f"Input file not found: {file_path}"})
+            return
+            
+        future = self.server.service.submit(file_path, output_dir, format_key)
+        try:
+            self.send_json(200, future.result())
+        except Exception as e:
+            self.send_json(500, {'error': str(e)})
+            
+    def log_message(self, format, *args):
+        """Route request logs through the service logger"""
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+def parse_args(argv=None):
+    """Parse command-line options; without --service the GUI is started"""
+    parser = argparse.ArgumentParser(description="HD Supply™ Velocity Validator")
+    parser.add_argument("--service", action="store_true",
+                        help="Run as a long-running validation service instead of the GUI")
+    parser.add_argument("--email", help="HD Supply email address for Snowflake SSO")
+    parser.add_argument("--watch-dir", help="Drop folder to watch for input files")
+    parser.add_argument("--host", default=SERVICE_HOST, help="HTTP API bind address")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT,
+                        help="HTTP API port (0 disables the HTTP API)")
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS,
+                        help="Number of concurrent validation jobs")
+    parser.add_argument("--refresh-minutes", type=float, default=SERVICE_REFRESH_MINUTES,
+                        help="Minutes between velocity data refreshes")
+    parser.add_argument("--partitions", type=int, default=1,
+                        help=f"Concurrent partition queries per velocity refresh (max {MAX_FETCH_PARTITIONS})")
+    parser.add_argument("--partition-by", default=PARTITION_KEYS[0], choices=PARTITION_KEYS,
+                        help="SKUEXTRACT column used to partition the fetch")
+    parser.add_argument("--format", default="parquet", choices=list(FORMAT_EXTENSIONS),
+                        help="Default output format")
+    parser.add_argument("--mismatch-report", action="store_true",
+                        help="Also write a branded mismatches-only Excel report")
+    parser.add_argument("--split-by", default=EXCEL_SPLIT_OPTIONS[0], choices=EXCEL_SPLIT_OPTIONS,
+                        help="How oversized Excel reports are split")
+    return parser.parse_args(argv)
+
 
+def run_service(args):
+    """Start the validation service from parsed command-line options"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    
+    email = (args.email or "").strip()
+    if "@hdsupply.com" not in email.lower():
+        raise SystemExit("--email must be a valid HD Supply email address")
+    if not args.watch_dir and not args.port:
+        raise SystemExit("Enable at least one of --watch-dir or --port")
+        
+    service = ValidationService(
+        email=email,
+        watch_dir=args.watch_dir,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        refresh_minutes=args.refresh_minutes,
+        format_key=args.format,
+        include_mismatch_report=args.mismatch_report,
+        excel_split_by=args.split_by,
+        partitions=args.partitions,
+        partition_by=args.partition_by
+    )
+    service.serve_forever()
 
-def main():
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.service:
+        run_service(args)
+        return
+        
     root = tk.Tk()
     
     # Center window on screen
-    window_width = 900
-    window_height = 750
     screen_width = root.winfo_screenwidth()
     screen_height = root.winfo_screenheight()
-    center_x = int(screen_width/2 - window_width/2)
-    center_y = int(screen_height/2 - window_height/2)
+    window_width = WINDOW_WIDTH
+    window_height = window_height_for_screen(screen_height)
+    center_x = max(0, int(screen_width/2 - window_width/2))
+    center_y = max(0, int(screen_height/2 - window_height/2))
     root.geometry(f'{window_width}x{window_height}+{center_x}+{center_y}')
     
     app = VelocityValidatorApp(root)
     root.mainloop()
 
 if __name__ == "__main__":
+    # Required for worker processes in the frozen PyInstaller executable
+    multiprocessing.freeze_support()
     main()